@@ -27,11 +27,28 @@ class RedisConfig:
     db: int
 
 
+@dataclass
+class ReminderConfig:
+    send_concurrency: int  # Сколько сообщений отправляем одновременно
+    rate_limit: float  # Общий лимит сообщений в секунду на все реплики (Telegram: ~30)
+    chat_rate_limit: float  # Лимит сообщений в секунду в один чат
+    batch_size: int  # Сколько напоминаний обрабатываем за одну пачку
+    lease_seconds: int  # На сколько воркер забирает пачку outbox
+    max_attempts: int  # Сколько раз пытаемся доставить уведомление
+    backoff_base: int  # Базовая задержка повтора, секунды (удваивается)
+    backoff_max: int  # Максимальная задержка повтора, секунды
+    max_per_tick: int  # Сколько напоминаний диспетчер берёт за одно срабатывание
+    catchup_pause: int  # Пауза между срабатываниями при догоне после простоя, секунды
+    catchup_max_lag: int  # Старше скольких секунд повторяющиеся пропускаются (0 - не пропускать)
+    dead_retention_days: int  # Сколько дней хранить недоставленные (DEAD) уведомления
+
+
 @dataclass
 class Config:
     database: DB
     tg_bot: TgBot
     redis: RedisConfig
+    reminders: ReminderConfig
     scheduler_interval: int
     mode: str  # Добавим режим работы
 
@@ -71,5 +88,19 @@ def load_config(path: str | None = None) -> Config:
             password=env('REDIS_PASSWORD', None),  # None если не задан
             db=int(env('REDIS_DB', 0))
         ),
+        reminders=ReminderConfig(
+            send_concurrency=int(env('REMINDER_SEND_CONCURRENCY', 20)),
+            rate_limit=float(env('REMINDER_RATE_LIMIT', 25)),
+            chat_rate_limit=float(env('REMINDER_CHAT_RATE_LIMIT', 1)),
+            batch_size=int(env('REMINDER_BATCH_SIZE', 500)),
+            lease_seconds=int(env('REMINDER_LEASE_SECONDS', 120)),
+            max_attempts=int(env('REMINDER_MAX_ATTEMPTS', 5)),
+            backoff_base=int(env('REMINDER_BACKOFF_BASE', 30)),
+            backoff_max=int(env('REMINDER_BACKOFF_MAX', 3600)),
+            max_per_tick=int(env('REMINDER_MAX_PER_TICK', 5000)),
+            catchup_pause=int(env('REMINDER_CATCHUP_PAUSE', 10)),
+            catchup_max_lag=int(env('REMINDER_CATCHUP_MAX_LAG', 0)),
+            dead_retention_days=int(env('REMINDER_DEAD_RETENTION_DAYS', 7)),
+        ),
         scheduler_interval=int(env('SCHEDULER_INTERVAL', 300)),
     )
@@ -1,4 +1,4 @@
 from .psql import engine,Base,create_db
 from .models.users import User
 from .models.medicine import *
-from .models.reminder import Reminder
\ No newline at end of file
+from .models.reminder import Reminder, ReminderOutbox
\ No newline at end of file
@@ -2,14 +2,26 @@ from datetime import datetime, date
 from typing import Optional, List
 from sqlalchemy import (
     BigInteger, String, Integer, Text, Date, Numeric,
-    ForeignKey, TIMESTAMP, text, Enum, Table, Column, Boolean
+    ForeignKey, TIMESTAMP, text, Enum, Table, Column, Boolean, Index, Computed
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
 from app.database.psql import Base
 
 
+def _search_vector_sql(**weights: str) -> str:
+    """Выражение tsvector по колонкам с весами: русская морфология + simple
+    (точные слова, латиница и названия, которые не стеммятся)"""
+    parts = [
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weights.items()
+        for config in ("russian", "simple")
+    ]
+    return " || ".join(parts)
+
+
 # Enum для типов лекарств
 class MedicineType(enum.Enum):
     TABLETS = "таблетки"
@@ -47,7 +59,9 @@ user_medicine_kit_association = Table(
     'user_medicine_kits',
     Base.metadata,
     Column('user_id', BigInteger, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
-    Column('medicine_kit_id', Integer, ForeignKey('medicine_kits.id', ondelete='CASCADE'), primary_key=True)
+    Column('medicine_kit_id', Integer, ForeignKey('medicine_kits.id', ondelete='CASCADE'), primary_key=True),
+    # PK (user_id, medicine_kit_id) не помогает искать пользователей аптечки
+    Index('ix_user_medicine_kits_medicine_kit_id', 'medicine_kit_id'),
 )
 
 # Модель аптечки
@@ -78,9 +92,21 @@ class MedicineKit(Base):
 # Справочник лекарств
 class Medicine(Base):
     __tablename__ = "medicines"
+    __table_args__ = (
+        # Триграммный индекс (pg_trgm) под поиск похожих и поиск по подстроке
+        Index(
+            "ix_medicines_search_key_trgm", "search_key",
+            postgresql_using="gin",
+            postgresql_ops={"search_key": "gin_trgm_ops"},
+        ),
+        Index("ix_medicines_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    # Нормализованное название (см. app.utils.medicine_names), заполняется репозиторием.
+    # Text: после транслитерации ключ длиннее названия (щ -> shch)
+    search_key: Mapped[str] = mapped_column(Text, nullable=False, index=True)
     medicine_type: Mapped[MedicineType] = mapped_column(
         Enum(MedicineType, native_enum=False), nullable=False
     )
@@ -92,6 +118,12 @@ class Medicine(Base):
     # Дополнительные поля
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Полнотекстовый поиск по названию, дозировке и заметкам (считает PostgreSQL)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(_search_vector_sql(name="A", dosage="B", notes="C"), persisted=True),
+        deferred=True
+    )
+
     # Флаги состояния (целочисленное поле для битовых флагов)
     # Первый бит (1) отвечает за «verified»
     flags: Mapped[int] = mapped_column(Integer, default=0)
@@ -112,13 +144,18 @@ class Medicine(Base):
 # Конкретный экземпляр лекарства в аптечке
 class MedicineItem(Base):
     __tablename__ = "medicine_items"
+    __table_args__ = (
+        Index("ix_medicine_items_search_vector", "search_vector", postgresql_using="gin"),
+        # Лекарства аптечки и просроченные по аптечкам (expiry_date < today)
+        Index("ix_medicine_items_kit_expiry", "medicine_kit_id", "expiry_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     medicine_kit_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("medicine_kits.id", ondelete="CASCADE"), nullable=False
     )
     medicine_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("medicines.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("medicines.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
     # Основные поля экземпляра
@@ -130,6 +167,12 @@ class MedicineItem(Base):
     location: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Полнотекстовый поиск по месту хранения и заметкам (считает PostgreSQL)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(_search_vector_sql(location="A", notes="C"), persisted=True),
+        deferred=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")
     )
@@ -1,14 +1,26 @@
-from datetime import datetime
+from datetime import datetime, time
+from typing import Optional
+import enum
 
-from sqlalchemy import BigInteger, Integer, Text, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import BigInteger, Integer, Text, Boolean, TIMESTAMP, Time, ForeignKey, Index, Enum
 from sqlalchemy import text as sa_text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database.psql import Base
 
 
+# Статусы уведомлений в outbox
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"  # Ждёт отправки (в т.ч. повторной)
+    DEAD = "dead"  # Доставить не удалось (бот заблокирован / исчерпаны попытки)
+
+
 class Reminder(Base):
     __tablename__ = "reminders"
+    __table_args__ = (
+        # Частичный индекс под выборку просроченных напоминаний диспетчером
+        Index("ix_reminders_due", "next_fire_at", postgresql_where=sa_text("is_active")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), index=True)
@@ -16,6 +28,9 @@ class Reminder(Base):
     interval_days: Mapped[int] = mapped_column(Integer)
     is_one_time: Mapped[bool] = mapped_column(Boolean, default=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Время срабатывания по часовому поясу пользователя
+    fire_time: Mapped[time] = mapped_column(Time, default=time(9, 0), server_default=sa_text("'09:00'"))
+    # Следующее срабатывание (UTC)
     next_fire_at: Mapped[datetime] = mapped_column(TIMESTAMP)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=sa_text("CURRENT_TIMESTAMP")
@@ -25,3 +40,37 @@ class Reminder(Base):
 
     def __repr__(self):
         return f"<Reminder id={self.id} user_id={self.user_id}>"
+
+
+# Очередь уведомлений: "напоминание сработало" отделено от "сообщение доставлено"
+class ReminderOutbox(Base):
+    __tablename__ = "reminder_outbox"
+    __table_args__ = (
+        Index(
+            "ix_reminder_outbox_pending", "next_attempt_at",
+            postgresql_where=sa_text("status = 'PENDING'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    reminder_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("reminders.id", ondelete="CASCADE"), index=True
+    )
+    user_id: Mapped[int] = mapped_column(BigInteger)
+    text: Mapped[str] = mapped_column(Text)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus, native_enum=False), default=OutboxStatus.PENDING
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(TIMESTAMP)
+    # Плановое время срабатывания напоминания (UTC) - от него считается задержка доставки
+    fire_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    # Аренда записи воркером: пока не истекла, другие воркеры её не берут
+    locked_until: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=sa_text("CURRENT_TIMESTAMP")
+    )
+
+    def __repr__(self):
+        return f"<ReminderOutbox id={self.id} reminder_id={self.reminder_id} status={self.status.name}>"
@@ -16,6 +16,8 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)  # telegram user_id
     username: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Часовой пояс IANA (Europe/Moscow), по нему срабатывают напоминания
+    timezone: Mapped[str] = mapped_column(String(64), default="UTC", server_default="UTC")
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")
     )
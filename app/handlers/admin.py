@@ -1,6 +1,9 @@
+import csv
+import io
+
 from aiogram import Router, F, Bot
-from aiogram.filters import Command, Filter
-from aiogram.types import Message, CallbackQuery, InlineKeyboardButton
+from aiogram.filters import Command, CommandObject, Filter
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, BufferedInputFile
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +15,7 @@ from app.lexicon.lexicon import LEXICON_RU
 from app.repositoryes.MedicineRepository import MedicineRepository
 from app.repositoryes.user_repository import UserRepository
 from app.utils.flags import Flags
+from app.utils.medicine_index import BulkMatchStatus, bulk_match
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from app.keyboard.admin_kb import (
     get_users_keyboard,
@@ -23,6 +27,9 @@ from app.core.config import load_config
 
 config = load_config()
 
+# Сколько строк каждого статуса показывать в ответе /dedup (полный отчёт - файлом)
+DEDUP_PREVIEW = 20
+
 class IsAdmin(Filter):
     def __init__(self):
         self.admin_id = config.tg_bot.ID_admin
@@ -300,6 +307,61 @@ async def cancel_admin_flow(callback: CallbackQuery,
     await callback.answer(ADMIN_LEXICON_RU['cancelled'])
 
 
+# -------------------- Dedup -------------------- #
+@router.message(Command('dedup'))
+async def cmd_dedup(message: Message, bot: Bot, command: CommandObject, db_session: AsyncSession):
+    """Сверка списка названий со справочником перед массовой загрузкой.
+
+    Названия - по одному в строке после команды или в .txt-файле с подписью /dedup.
+    """
+    if message.document:
+        file = await bot.download(message.document)
+        text = file.read().decode("utf-8-sig", errors="replace")
+    else:
+        text = command.args or ""
+    names = [line.strip() for line in text.splitlines() if line.strip()]
+    if not names:
+        await message.answer(ADMIN_LEXICON_RU['dedup_usage'])
+        return
+
+    matches = await bulk_match(names, MedicineRepository(db_session).get_verified_entries)
+    by_status = {status: [m for m in matches if m.status == status] for status in BulkMatchStatus}
+
+    lines = [ADMIN_LEXICON_RU['dedup_summary'].format(
+        total=len(matches),
+        link=len(by_status[BulkMatchStatus.LINK]),
+        flag=len(by_status[BulkMatchStatus.FLAG]),
+        new=len(by_status[BulkMatchStatus.NEW]),
+    )]
+    for status in (BulkMatchStatus.FLAG, BulkMatchStatus.NEW):
+        if not by_status[status]:
+            continue
+        lines.append("")
+        lines.append(ADMIN_LEXICON_RU[f'dedup_{status.value}_title'])
+        for match in by_status[status][:DEDUP_PREVIEW]:
+            if match.match is not None:
+                lines.append(f"{match.name} → {match.match.name} ({match.score:.0f})")
+            else:
+                lines.append(match.name)
+    await message.answer("\n".join(lines)[:4096])
+
+    if any(len(group) > DEDUP_PREVIEW for group in by_status.values()):
+        report = io.StringIO()
+        writer = csv.writer(report)
+        writer.writerow(["name", "status", "medicine_id", "medicine_name", "score"])
+        for match in matches:
+            writer.writerow([
+                match.name,
+                match.status.value,
+                match.match.id if match.match else "",
+                match.match.name if match.match else "",
+                f"{match.score:.0f}",
+            ])
+        await message.answer_document(
+            BufferedInputFile(report.getvalue().encode("utf-8-sig"), filename="dedup.csv")
+        )
+
+
 # -------------------- Broadcast -------------------- #
 @router.message(Command('broadcast'))
 async def start_broadcast(message: Message, state: FSMContext, db_session: AsyncSession):
@@ -338,6 +400,8 @@ async def process_broadcast(message: Message, bot: Bot, state: FSMContext, db_se
         await message.answer(LEXICON_RU["broadcast_no_users"])
         await state.clear()
         return
+    # Рассылка долгая - фиксируем транзакцию сразу, чтобы не держать соединение из пула
+    await db_session.commit()
 
     sent = 0
     for user in users:
@@ -9,42 +9,37 @@ from app.keyboard.medicine_kb import get_medicine_items_keyboard
 from app.lexicon.lexicon import LEXICON_RU
 from app.repositoryes.MedicineKitRepository import MedicineKitRepository
 from app.repositoryes.MedicineItemRepository import MedicineItemRepository
+from app.repositoryes.pagination import Cursor, FIRST_PAGE
 
 router = Router()
 
+# Экземпляров на странице
+PER_PAGE = 5
+
 
 @router.message(Command("expired"))
 async def cmd_expired(message: Message, db_session: AsyncSession):
     """Показать просроченные лекарства"""
     user_id = message.from_user.id
 
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await message.answer("У вас нет аптечек")
-        return
-
-    # Собираем просроченные из всех аптечек
+    # Просроченные из всех аптечек: страница и количество, без обхода аптечек
     item_repo = MedicineItemRepository(db_session)
-    all_expired = []
-
-    for kit in kits:
-        expired = await item_repo.get_expired(kit.id)
-        all_expired.extend(expired)
+    page = await item_repo.expired_for_user(user_id, FIRST_PAGE, per_page=PER_PAGE)
 
-    if not all_expired:
+    if not page.items:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await message.answer("У вас нет аптечек")
+            return
         await message.answer(LEXICON_RU['expired_no_items'])
         return
 
     # Формируем список
-    result_text = LEXICON_RU['expired_list']
+    result_text = LEXICON_RU['expired_list'].format(count=page.total)
 
     # Используем унифицированную клавиатуру
     await message.answer(
         result_text,
-        reply_markup=get_medicine_items_keyboard(all_expired, action="view", page=0, page_prefix="expired_page")
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix="expired_page")
     )
 
 
@@ -52,40 +47,30 @@ async def cmd_expired(message: Message, db_session: AsyncSession):
 async def expired_page_callback(callback: CallbackQuery, db_session: AsyncSession):
     """Обработка пагинации для просроченных лекарств"""
     try:
-        page = int(callback.data.split(":")[1])
+        cursor = Cursor.decode(callback.data.split(":")[1])
     except (ValueError, IndexError):
         await callback.answer("Ошибка при обработке запроса", show_alert=True)
         return
 
     user_id = callback.from_user.id
 
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await callback.answer("У вас нет аптечек", show_alert=True)
-        return
-
-    # Собираем просроченные из всех аптечек
     item_repo = MedicineItemRepository(db_session)
-    all_expired = []
-
-    for kit in kits:
-        expired = await item_repo.get_expired(kit.id)
-        all_expired.extend(expired)
+    page = await item_repo.expired_for_user(user_id, cursor, per_page=PER_PAGE)
 
-    if not all_expired:
+    if not page.items:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await callback.answer("У вас нет аптечек", show_alert=True)
+            return
         await callback.message.edit_text(LEXICON_RU['expired_no_items'])
         await callback.answer()
         return
 
     # Формируем список
-    result_text = LEXICON_RU['expired_list']
+    result_text = LEXICON_RU['expired_list'].format(count=page.total)
 
     # Используем унифицированную клавиатуру
     await callback.message.edit_text(
         result_text,
-        reply_markup=get_medicine_items_keyboard(all_expired, action="view", page=page, page_prefix="expired_page")
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix="expired_page")
     )
-    await callback.answer()
\ No newline at end of file
+    await callback.answer()
@@ -14,6 +14,7 @@ from app.keyboard.medicine_kb import (
 from app.lexicon.lexicon import LEXICON_RU
 from app.repositoryes.MedicineKitRepository import MedicineKitRepository
 from app.repositoryes.MedicineItemRepository import MedicineItemRepository
+from app.repositoryes.pagination import Cursor, FIRST_PAGE
 from datetime import date
 
 router = Router()
@@ -25,7 +26,7 @@ async def cmd_my_kits(message: Message, db_session: AsyncSession):
     user_id = message.from_user.id
 
     kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id=user_id,deleted=False)
+    kits = await kit_repo.get_summaries(user_id)
 
     if not kits:
         await message.answer(LEXICON_RU['my_kits_empty'])
@@ -35,12 +36,9 @@ async def cmd_my_kits(message: Message, db_session: AsyncSession):
     text = LEXICON_RU['my_kits_list'].format(count=len(kits))
 
     for i, kit in enumerate(kits, 1):
-        items_count = len(kit.items)
-        users_count = len(kit.users)
-
         text += f"\n{i}. 📦 {kit.name}"
-        text += f"\n   💊 Лекарств: {items_count}"
-        text += f"\n   👥 Пользователей: {users_count}"
+        text += f"\n   💊 Лекарств: {kit.item_count}"
+        text += f"\n   👥 Пользователей: {kit.user_count}"
         if kit.description:
             text += f"\n   📝 {kit.description}"
         text += "\n"
@@ -54,7 +52,7 @@ async def cmd_kits(message: Message, db_session: AsyncSession):
     user_id = message.from_user.id
 
     kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id=user_id)
+    kits = await kit_repo.get_summaries(user_id)
 
     if not kits:
         await message.answer(LEXICON_RU.get('my_kits_empty', 'У вас нет аптечек'))
@@ -64,94 +62,51 @@ async def cmd_kits(message: Message, db_session: AsyncSession):
     await message.answer(text, reply_markup=get_medicine_kit_keyboard(kits))
 
 
-@router.callback_query(F.data.startswith("select_kit:"))
-async def show_kit_items(callback: CallbackQuery, db_session: AsyncSession):
-    """Показать список лекарств в выбранной аптечке (первый экран пагинации)"""
-    kit_id = int(callback.data.split(":")[1])
-
+async def _show_kit_page(callback: CallbackQuery, db_session: AsyncSession, kit_id: int, cursor: Cursor):
+    """Страница лекарств аптечки: загружается только она сама"""
     kit_repo = MedicineKitRepository(db_session)
-    kit = await kit_repo.get(kit_id)
+    kit = await kit_repo.get(kit_id, with_relations=False)
 
     if not kit or kit.deleted:
         await callback.answer("Аптечка не найдена или удалена", show_alert=True)
         return
 
-    # Доступ к атрибутам пока сессия активна
-    kit_name = kit.name
-    kit_id_val = kit.id
-    items = list(kit.items) if kit.items else []
-    
-    # Принудительно загружаем medicine для каждого item, пока сессия активна
-    for item in items:
-        if item.medicine:
-            _ = item.medicine.name
-            _ = item.medicine.dosage
+    item_repo = MedicineItemRepository(db_session)
+    page = await item_repo.page_by_kit(kit.id, cursor, per_page=5, with_total=True)
 
-    # Формируем текст для первого экрана
     header = LEXICON_RU.get('kit_items_header', 'Аптечка "{name}" — лекарства ({count}):')
-    text = header.format(name=kit_name, count=len(items))
-
-    # Пагинация: показываем по 5 элементов
-    per_page = 5
+    text = header.format(name=kit.name, count=page.total)
 
     await callback.message.edit_text(
-        text, 
+        text,
         reply_markup=get_medicine_items_keyboard(
-            items, 
-            action="view", 
-            page=0, 
-            per_page=per_page, 
-            page_prefix=f"kit_page:{kit_id_val}"
+            page,
+            action="view",
+            page_prefix=f"kit_page:{kit.id}"
         )
     )
     await callback.answer()
 
 
+@router.callback_query(F.data.startswith("select_kit:"))
+async def show_kit_items(callback: CallbackQuery, db_session: AsyncSession):
+    """Показать список лекарств в выбранной аптечке (первый экран пагинации)"""
+    kit_id = int(callback.data.split(":")[1])
+    await _show_kit_page(callback, db_session, kit_id, FIRST_PAGE)
+
+
 @router.callback_query(F.data.startswith("kit_page:"))
 async def kit_page_callback(callback: CallbackQuery, db_session: AsyncSession):
     """Обработка навигации по страницам в просмотре аптечки"""
     try:
-        _, kit_id_str, page_str = callback.data.split(":")
+        _, kit_id_str, cursor_str = callback.data.split(":")
         kit_id = int(kit_id_str)
-        page = int(page_str)
+        cursor = Cursor.decode(cursor_str)
     except Exception:
         await callback.answer()
         return
 
-    kit_repo = MedicineKitRepository(db_session)
-    kit = await kit_repo.get(kit_id)
-
-    if not kit or kit.deleted:
-        await callback.answer("Аптечка не найдена или удалена", show_alert=True)
-        return
-
-    # Доступ к атрибутам пока сессия активна
-    kit_name = kit.name
-    kit_id_val = kit.id
-    items = list(kit.items) if kit.items else []
-    
-    # Принудительно загружаем medicine для каждого item, пока сессия активна
-    for item in items:
-        if item.medicine:
-            _ = item.medicine.name
-            _ = item.medicine.dosage
-    
-    per_page = 5
-
-    header = LEXICON_RU.get('kit_items_header', 'Аптечка "{name}" — лекарства ({count}):')
-    text = header.format(name=kit_name, count=len(items))
-
-    await callback.message.edit_text(
-        text, 
-        reply_markup=get_medicine_items_keyboard(
-            items, 
-            action="view", 
-            page=page, 
-            per_page=per_page, 
-            page_prefix=f"kit_page:{kit_id_val}"
-        )
-    )
-    await callback.answer()
+    await _show_kit_page(callback, db_session, kit_id, cursor)
 
 
 
@@ -161,7 +116,7 @@ async def show_trash_kits(callback: CallbackQuery, db_session: AsyncSession):
     user_id = callback.from_user.id
 
     kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id, deleted=True)
+    kits = await kit_repo.get_summaries(user_id, deleted=True)
 
     if not kits:
         await callback.message.edit_text(LEXICON_RU.get('my_kits_trash_empty', '🗑 У вас нет удалённых аптечек'))
@@ -172,12 +127,9 @@ async def show_trash_kits(callback: CallbackQuery, db_session: AsyncSession):
     text = LEXICON_RU.get('my_kits_trash_list', '🗑 Удалённые аптечки ({count}):\n').format(count=len(kits))
 
     for i, kit in enumerate(kits, 1):
-        items_count = len(kit.items)
-        users_count = len(kit.users)
-
         text += f"\n{i}. 🗑 {kit.name}"
-        text += f"\n   💊 Лекарств: {items_count}"
-        text += f"\n   👥 Пользователей: {users_count}"
+        text += f"\n   💊 Лекарств: {kit.item_count}"
+        text += f"\n   👥 Пользователей: {kit.user_count}"
         if kit.description:
             text += f"\n   📝 {kit.description}"
         text += "\n"
@@ -287,12 +239,13 @@ async def view_item_details(callback: CallbackQuery, db_session: AsyncSession):
             if parts[1] != "back":
                 raise ValueError(f"Invalid callback data format: expected 'back', got '{parts[1]}'")
             back_prefix = parts[2]  # page_prefix может содержать двоеточия
-            back_page = int(parts[3])
+            back_page = parts[3]  # курсор страницы
+            Cursor.decode(back_page)
         else:
             # Старый формат без информации о возврате
             item_id = int(data.split(":")[1])
             back_prefix = None
-            back_page = 0
+            back_page = "0"
     except (ValueError, IndexError) as e:
         await callback.answer(f"Ошибка при обработке запроса: {str(e)}", show_alert=True)
         return
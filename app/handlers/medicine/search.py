@@ -1,6 +1,7 @@
 from aiogram import Router, F
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models.medicine import MedicineCategory
@@ -11,57 +12,164 @@ from app.keyboard.medicine_kb import (
 from app.lexicon.lexicon import LEXICON_RU
 from app.repositoryes.MedicineKitRepository import MedicineKitRepository
 from app.repositoryes.MedicineItemRepository import MedicineItemRepository
+from app.repositoryes.pagination import Cursor, Page
+from app.utils.search_cache import MAX_RESULT_IDS, get_search_page, save_search
 
 router = Router()
 
+# Экземпляров на странице результатов поиска
+PER_PAGE = 5
 
-@router.message(Command("find"))
-async def cmd_find(message: Message):
-    """Поиск по категории"""
-    await message.answer(
-        LEXICON_RU['find_choose_category'],
-        reply_markup=get_category_search_keyboard()
-    )
 
+def _results_text(kind: str, query: str, total: int) -> str:
+    if kind == "category":
+        return LEXICON_RU['find_results'].format(count=total)
+    if kind == "text":
+        return LEXICON_RU['find_text_results'].format(query=query, count=total)
+    return LEXICON_RU['search_results'].format(query=query)
 
-@router.callback_query(F.data.startswith("find_category:"))
-async def process_category_search(callback: CallbackQuery, db_session: AsyncSession):
-    """Обработка выбора категории"""
-    category_name = callback.data.split(":")[1]
-    category = MedicineCategory[category_name]
-    user_id = callback.from_user.id
 
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
+async def _start_search(
+        db_session: AsyncSession,
+        redis: Redis,
+        user_id: int,
+        kind: str,
+        query: str
+) -> tuple[str, Page] | None:
+    """Выполнить поиск один раз и сохранить id результатов в Redis.
 
-    if not kits:
-        await callback.answer("У вас нет аптечек", show_alert=True)
+    Возвращает токен поиска и первую страницу или None, если ничего не найдено.
+    """
+    item_repo = MedicineItemRepository(db_session)
+    if kind == "category":
+        ids = await item_repo.search_ids_for_user(user_id, category=MedicineCategory[query], limit=MAX_RESULT_IDS)
+    elif kind == "text":
+        ids = await item_repo.full_text_ids_for_user(user_id, query, limit=MAX_RESULT_IDS)
+    else:
+        ids = await item_repo.search_ids_for_user(user_id, name=query, limit=MAX_RESULT_IDS)
+    if not ids:
+        return None
+
+    token = await save_search(redis, user_id, ids, kind, query)
+    items = await item_repo.get_many(ids[:PER_PAGE])
+    page = Page(items=items, cursor=Cursor(page=0), has_next=len(ids) > PER_PAGE, has_prev=False, total=len(ids))
+    return token, page
+
+
+@router.callback_query(F.data.startswith("search_page:"))
+async def search_page_callback(callback: CallbackQuery, db_session: AsyncSession, redis: Redis):
+    """Пагинация по сохранённым результатам поиска: search_page:{token}:{cursor}"""
+    try:
+        _, token, cursor_str = callback.data.split(":")
+        page_num = Cursor.decode(cursor_str).page or 0
+    except (ValueError, IndexError):
+        await callback.answer("Ошибка при обработке запроса", show_alert=True)
         return
 
-    # Собираем все экземпляры нужной категории из всех аптечек пользователя
-    item_repo = MedicineItemRepository(db_session)
-    all_items = []
+    cached = await get_search_page(redis, callback.from_user.id, token, page_num, PER_PAGE)
+    if cached is None:
+        await callback.answer(LEXICON_RU['search_expired'], show_alert=True)
+        return
+    ids, total, meta = cached
+
+    # Из БД берутся только экземпляры текущей страницы
+    items = await MedicineItemRepository(db_session).get_many(ids)
+    page = Page(
+        items=items,
+        cursor=Cursor(page=page_num),
+        has_next=(page_num + 1) * PER_PAGE < total,
+        has_prev=page_num > 0,
+        total=total,
+    )
+
+    await callback.message.edit_text(
+        _results_text(meta["kind"], meta["query"], total),
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix=f"search_page:{token}")
+    )
+    await callback.answer()
 
-    for kit in kits:
-        items = await item_repo.get_by_kit(kit.id)
-        # Фильтруем по категории
-        category_items = [item for item in items if item.medicine.category == category]
-        all_items.extend(category_items)
 
-    if not all_items:
+async def _show_category_results(callback: CallbackQuery, db_session: AsyncSession, category_name: str, cursor: Cursor):
+    """Страница результатов поиска по категории (сообщения до кэширования поиска)"""
+    category = MedicineCategory[category_name]
+    user_id = callback.from_user.id
+
+    item_repo = MedicineItemRepository(db_session)
+    page = await item_repo.search_for_user(user_id, category=category, cursor=cursor, per_page=PER_PAGE)
+
+    if not page.total:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await callback.answer("У вас нет аптечек", show_alert=True)
+            return
         await callback.message.edit_text(LEXICON_RU['find_no_results'])
         await callback.answer()
         return
 
-
     # Формируем текст результатов
-    result_text = LEXICON_RU['find_results'].format(count=len(all_items))
+    result_text = LEXICON_RU['find_results'].format(count=page.total)
 
     # Используем унифицированную клавиатуру с префиксом для пагинации
     await callback.message.edit_text(
         result_text,
-        reply_markup=get_medicine_items_keyboard(all_items, action="view", page=0, page_prefix=f"search_page_category:{category_name}")
+        reply_markup=get_medicine_items_keyboard(
+            page, action="view", page_prefix=f"search_page_category:{category_name}"
+        )
+    )
+    await callback.answer()
+
+
+@router.message(Command("find"))
+async def cmd_find(message: Message, command: CommandObject, db_session: AsyncSession, redis: Redis):
+    """Поиск по категории, а с текстом (/find в холодильнике) - полнотекстовый поиск"""
+    if command.args:
+        await _find_text(message, db_session, redis, command.args.strip())
+        return
+
+    await message.answer(
+        LEXICON_RU['find_choose_category'],
+        reply_markup=get_category_search_keyboard()
+    )
+
+
+async def _find_text(message: Message, db_session: AsyncSession, redis: Redis, query: str):
+    """Полнотекстовый поиск по названию, заметкам, дозировке и месту хранения"""
+    user_id = message.from_user.id
+
+    found = await _start_search(db_session, redis, user_id, "text", query)
+    if found is None:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await message.answer("У вас нет аптечек")
+            return
+        await message.answer(LEXICON_RU['find_text_no_results'].format(query=query))
+        return
+    token, page = found
+
+    await message.answer(
+        _results_text("text", query, page.total),
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix=f"search_page:{token}")
+    )
+
+
+@router.callback_query(F.data.startswith("find_category:"))
+async def process_category_search(callback: CallbackQuery, db_session: AsyncSession, redis: Redis):
+    """Обработка выбора категории"""
+    category_name = callback.data.split(":")[1]
+    user_id = callback.from_user.id
+
+    found = await _start_search(db_session, redis, user_id, "category", category_name)
+    if found is None:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await callback.answer("У вас нет аптечек", show_alert=True)
+            return
+        await callback.message.edit_text(LEXICON_RU['find_no_results'])
+        await callback.answer()
+        return
+    token, page = found
+
+    # Используем унифицированную клавиатуру, в callback_data - только токен поиска
+    await callback.message.edit_text(
+        _results_text("category", category_name, page.total),
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix=f"search_page:{token}")
     )
     await callback.answer()
 
@@ -75,91 +183,48 @@ async def cancel_search(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("search_page_category:"))
 async def search_page_category_callback(callback: CallbackQuery, db_session: AsyncSession):
-    """Обработка пагинации для поиска по категории"""
+    """Обработка пагинации для поиска по категории (старые сообщения)"""
     try:
         parts = callback.data.split(":")
         category_name = parts[1]
-        page = int(parts[2])
+        cursor = Cursor.decode(parts[2])
     except (ValueError, IndexError):
         await callback.answer("Ошибка при обработке запроса", show_alert=True)
         return
 
-    category = MedicineCategory[category_name]
-    user_id = callback.from_user.id
-
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await callback.answer("У вас нет аптечек", show_alert=True)
-        return
-
-    # Собираем все экземпляры нужной категории из всех аптечек пользователя
-    item_repo = MedicineItemRepository(db_session)
-    all_items = []
-
-    for kit in kits:
-        items = await item_repo.get_by_kit(kit.id)
-        # Фильтруем по категории
-        category_items = [item for item in items if item.medicine.category == category]
-        all_items.extend(category_items)
-
-    if not all_items:
-        await callback.message.edit_text(LEXICON_RU['find_no_results'])
-        await callback.answer()
-        return
-
-    # Формируем текст результатов
-    result_text = LEXICON_RU['find_results'].format(count=len(all_items))
-
-    # Используем унифицированную клавиатуру
-    await callback.message.edit_text(
-        result_text,
-        reply_markup=get_medicine_items_keyboard(all_items, action="view", page=page, page_prefix=f"search_page_category:{category_name}")
-    )
-    await callback.answer()
+    await _show_category_results(callback, db_session, category_name, cursor)
 
 
 @router.callback_query(F.data.startswith("search_page_name:"))
 async def search_page_name_callback(callback: CallbackQuery, db_session: AsyncSession):
-    """Обработка пагинации для поиска по имени"""
+    """Обработка пагинации для поиска по имени (старые сообщения)"""
     try:
-        # Извлекаем query и page из callback_data
-        # Формат: search_page_name:{query}:{page}
+        # Извлекаем query и курсор страницы из callback_data
+        # Формат: search_page_name:{query}:{cursor}
         # Разбираем с конца, так как query может содержать двоеточия
         data = callback.data
         # Убираем префикс "search_page_name:"
         rest = data[len("search_page_name:"):]
-        # Последнее двоеточие разделяет query и page
+        # Последнее двоеточие разделяет query и курсор
         last_colon = rest.rfind(":")
         if last_colon == -1:
             raise ValueError("Invalid callback data format")
         query = rest[:last_colon]
-        page = int(rest[last_colon + 1:])
+        cursor = Cursor.decode(rest[last_colon + 1:])
     except (ValueError, IndexError):
         await callback.answer("Ошибка при обработке запроса", show_alert=True)
         return
 
     user_id = callback.from_user.id
 
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await callback.answer("У вас нет аптечек", show_alert=True)
-        return
-
-    # Ищем по всем аптечкам
+    # Ищем по всем аптечкам сразу
     item_repo = MedicineItemRepository(db_session)
-    all_items = []
-
-    for kit in kits:
-        items = await item_repo.search_in_kit(kit.id, query)
-        all_items.extend(items)
+    page = await item_repo.search_for_user(user_id, name=query, cursor=cursor, per_page=PER_PAGE)
 
-    if not all_items:
+    if not page.total:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await callback.answer("У вас нет аптечек", show_alert=True)
+            return
         await callback.message.edit_text(LEXICON_RU['search_no_results'].format(query=query))
         await callback.answer()
         return
@@ -168,39 +233,30 @@ async def search_page_name_callback(callback: CallbackQuery, db_session: AsyncSe
     result_text = LEXICON_RU['search_results'].format(query=query)
     await callback.message.edit_text(
         result_text,
-        reply_markup=get_medicine_items_keyboard(all_items, action="view", page=page, page_prefix=f"search_page_name:{query}")
+        reply_markup=get_medicine_items_keyboard(
+            page, action="view", page_prefix=f"search_page_name:{query}"
+        )
     )
     await callback.answer()
 
 
 @router.message(F.text & ~F.text.startswith('/'))
-async def search_by_name(message: Message, db_session: AsyncSession):
+async def search_by_name(message: Message, db_session: AsyncSession, redis: Redis):
     """Поиск по названию лекарства в личном сообщении"""
     query = message.text.strip()
     user_id = message.from_user.id
 
-    # Получаем аптечки пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        return  # Молча игнорируем если нет аптечек
-
-    # Ищем по всем аптечкам
-    item_repo = MedicineItemRepository(db_session)
-    all_items = []
-
-    for kit in kits:
-        items = await item_repo.search_in_kit(kit.id, query)
-        all_items.extend(items)
-
-    if not all_items:
+    # Ищем по всем аптечкам сразу, результаты запоминаем для пагинации
+    found = await _start_search(db_session, redis, user_id, "name", query)
+    if found is None:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            return  # Молча игнорируем если нет аптечек
         await message.answer(LEXICON_RU['search_no_results'].format(query=query))
         return
+    token, page = found
 
-    # Показываем результаты с унифицированной клавиатурой с префиксом для пагинации
-    result_text = LEXICON_RU['search_results'].format(query=query)
+    # Показываем результаты с унифицированной клавиатурой, в callback_data - только токен поиска
     await message.answer(
-        result_text,
-        reply_markup=get_medicine_items_keyboard(all_items, action="view", page=0, page_prefix=f"search_page_name:{query}")
-    )
\ No newline at end of file
+        _results_text("name", query, page.total),
+        reply_markup=get_medicine_items_keyboard(page, action="view", page_prefix=f"search_page:{token}")
+    )
@@ -46,7 +46,7 @@ async def cmd_share(message: Message, state: FSMContext, db_session: AsyncSessio
     user_id = message.from_user.id
 
     kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
+    kits = await kit_repo.get_summaries(user_id)
 
     if not kits:
         await message.answer(LEXICON_RU['share_no_kits'])
@@ -15,9 +15,13 @@ from app.keyboard.medicine_kb import (
 from app.lexicon.lexicon import LEXICON_RU
 from app.repositoryes.MedicineKitRepository import MedicineKitRepository
 from app.repositoryes.MedicineItemRepository import MedicineItemRepository
+from app.repositoryes.pagination import Cursor, FIRST_PAGE
 
 router = Router()
 
+# Экземпляров на странице
+PER_PAGE = 10
+
 
 class UpdateItemStates(StatesGroup):
     """Состояния для обновления item"""
@@ -31,33 +35,22 @@ async def cmd_update(message: Message, state: FSMContext, db_session: AsyncSessi
     """Обновление item"""
     user_id = message.from_user.id
 
-    # Получаем все items пользователя
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await message.answer(LEXICON_RU['update_no_kits'])
-        return
-
-    # Собираем все items
+    # Первая страница items пользователя из всех аптечек
     item_repo = MedicineItemRepository(db_session)
-    all_items = []
-
-    for kit in kits:
-        items = await item_repo.get_by_kit(kit.id)
-        all_items.extend(items)
+    page = await item_repo.page_for_user(user_id, FIRST_PAGE, per_page=PER_PAGE)
 
-    if not all_items:
+    if not page.items:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await message.answer(LEXICON_RU['update_no_kits'])
+            return
         await message.answer(LEXICON_RU['update_no_items'])
         return
 
     await message.answer(
         LEXICON_RU['update_choose_item'],
         reply_markup=get_medicine_items_keyboard(
-            all_items,
+            page,
             action="view",
-            page=0,
-            per_page=10,
             page_prefix="update_page"
         )
     )
@@ -67,29 +60,22 @@ async def cmd_update(message: Message, state: FSMContext, db_session: AsyncSessi
 async def update_page_callback(callback: CallbackQuery, db_session: AsyncSession):
     """Пагинация списка лекарств для команды /update"""
     try:
-        _, page_str = callback.data.split(":")
-        page = int(page_str)
+        _, cursor_str = callback.data.split(":")
+        cursor = Cursor.decode(cursor_str)
     except Exception:
         await callback.answer()
         return
 
     user_id = callback.from_user.id
 
-    kit_repo = MedicineKitRepository(db_session)
-    kits = await kit_repo.get_by_user(user_id)
-
-    if not kits:
-        await callback.message.edit_text(LEXICON_RU['update_no_kits'])
-        await callback.answer()
-        return
-
     item_repo = MedicineItemRepository(db_session)
-    all_items = []
-    for kit in kits:
-        items = await item_repo.get_by_kit(kit.id)
-        all_items.extend(items)
+    page = await item_repo.page_for_user(user_id, cursor, per_page=PER_PAGE)
 
-    if not all_items:
+    if not page.items:
+        if not await MedicineKitRepository(db_session).has_kits(user_id):
+            await callback.message.edit_text(LEXICON_RU['update_no_kits'])
+            await callback.answer()
+            return
         await callback.message.edit_text(LEXICON_RU['update_no_items'])
         await callback.answer()
         return
@@ -97,10 +83,8 @@ async def update_page_callback(callback: CallbackQuery, db_session: AsyncSession
     await callback.message.edit_text(
         LEXICON_RU['update_choose_item'],
         reply_markup=get_medicine_items_keyboard(
-            all_items,
+            page,
             action="view",
-            page=page,
-            per_page=10,
             page_prefix="update_page"
         )
     )
@@ -10,10 +10,10 @@ from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from rapidfuzz import fuzz, process
 
-from app.database.models.medicine import MedicineType, MedicineCategory, Medicine
+from app.database.models.medicine import MedicineType, MedicineCategory
 from app.keyboard.medicine_kb import (
     get_medicine_enum_keyboard,
     get_skip_keyboard,
@@ -28,6 +28,9 @@ from app.repositoryes.MedicineRepository import MedicineRepository
 from app.repositoryes.MedicineItemRepository import MedicineItemRepository
 from app.states.medicine import MedicineUploadStates
 from app.utils.flags import Flags
+from app.utils.medicine_index import MedicineEntry
+from app.utils.medicine_names import normalize_medicine_name
+from app.utils.similar_cache import similar_cache
 
 router = Router()
 
@@ -94,38 +97,31 @@ def _fits_numeric(value: Decimal, precision: int = 10, scale: int = 2) -> bool:
 
 
 
-def find_similar_medicines(search_name: str, all_medicines: List[Medicine], limit: int = 3) -> List[
-    tuple[Medicine, float]]:
+async def find_similar_medicines(
+        medicine_repo: MedicineRepository,
+        search_name: str,
+        limit: int = 3,
+        redis: Optional[Redis] = None
+) -> List[tuple[MedicineEntry, float]]:
     """
-    Находит похожие лекарства с помощью RapidFuzz
+    Находит похожие верифицированные лекарства (pg_trgm + RapidFuzz).
+    Результаты кэшируются по нормализованному названию (LRU + Redis).
 
+    :param medicine_repo: Репозиторий лекарств
     :param search_name: Название для поиска
-    :param all_medicines: Список всех лекарств
     :param limit: Максимальное количество результатов
-    :return: Список кортежей (Medicine, similarity_score)
+    :param redis: Общий кэш между процессами (без него - только процессный LRU)
+    :return: Список кортежей (MedicineEntry, similarity_score)
     """
-    if not all_medicines:
+    key = normalize_medicine_name(search_name)
+    if not key:
         return []
-
-    # Создаем словарь {название: объект}
-    medicine_dict = {med.name: med for med in all_medicines}
-
-    # Ищем похожие названия
-    results = process.extract(
-        search_name,
-        medicine_dict.keys(),
-        scorer=fuzz.WRatio,
-        limit=limit
+    return await similar_cache.get_or_compute(
+        redis, key, limit, SIMILARITY_THRESHOLD,
+        compute=lambda: medicine_repo.find_similar(search_name, limit=limit, score_cutoff=SIMILARITY_THRESHOLD),
+        resolve=medicine_repo.get_entries,
     )
 
-    # Фильтруем по порогу и возвращаем объекты Medicine
-    similar = []
-    for name, score, _ in results:
-        if score >= SIMILARITY_THRESHOLD:
-            similar.append((medicine_dict[name], score))
-
-    return similar
-
 
 @router.message(Command("upload"))
 async def cmd_upload_start(message: Message,
@@ -136,7 +132,7 @@ async def cmd_upload_start(message: Message,
     kit_repo = MedicineKitRepository(db_session)
 
     # Получаем аптечки пользователя
-    kits = await kit_repo.get_by_user(user_id)
+    kits = await kit_repo.get_summaries(user_id)
 
     if not kits:
         # Если нет аптечек, создаем первую
@@ -212,7 +208,7 @@ async def process_create_new_kit(callback: CallbackQuery, state: FSMContext):
 
 
 @router.message(MedicineUploadStates.entering_name, F.text)
-async def process_medicine_name(message: Message, state: FSMContext, db_session: AsyncSession):
+async def process_medicine_name(message: Message, state: FSMContext, db_session: AsyncSession, redis: Redis):
     """Ввод названия лекарства с поиском похожих"""
     name = message.text.strip()
 
@@ -231,37 +227,32 @@ async def process_medicine_name(message: Message, state: FSMContext, db_session:
     # Сохраняем введенное название
     await state.update_data(search_medicine_name=name)
 
-    # Получаем все лекарства из базы
+    # Ищем похожие
     medicine_repo = MedicineRepository(db_session)
-    # Получаем только верифицированные лекарства для показа похожих
-    all_medicines = await medicine_repo.get_all(verified=True)
-
-    if all_medicines:
-        # Ищем похожие
-        similar = find_similar_medicines(name, all_medicines, limit=3)
-
-        if similar:
-            # Показываем похожие лекарства
-            similar_text = "🔍 Найдены похожие лекарства:\n\n"
-            for i, (med, score) in enumerate(similar, 1):
-                similar_text += f"{i}. {med.name}"
-                if med.dosage:
-                    similar_text += f" ({med.dosage})"
-                similar_text += f" - {med.medicine_type.value}, {med.category.value}"
-                similar_text += "\n"
-                similar_text += f"   Совпадение: {score:.0f}%\n\n"
-
-            similar_text += "Выберите подходящее или создайте новое:"
-
-            # Извлекаем только объекты Medicine
-            medicines_only = [med for med, _ in similar]
-
-            sent = await message.answer(
-                similar_text,
-                reply_markup=get_similar_medicines_keyboard(medicines_only)
-            )
-            await _store_last_bot_message(state, sent_message=sent)
-            return
+    similar = await find_similar_medicines(medicine_repo, name, limit=3, redis=redis)
+
+    if similar:
+        # Показываем похожие лекарства
+        similar_text = "🔍 Найдены похожие лекарства:\n\n"
+        for i, (med, score) in enumerate(similar, 1):
+            similar_text += f"{i}. {med.name}"
+            if med.dosage:
+                similar_text += f" ({med.dosage})"
+            similar_text += f" - {med.medicine_type.value}, {med.category.value}"
+            similar_text += "\n"
+            similar_text += f"   Совпадение: {score:.0f}%\n\n"
+
+        similar_text += "Выберите подходящее или создайте новое:"
+
+        # Извлекаем только записи лекарств
+        medicines_only = [med for med, _ in similar]
+
+        sent = await message.answer(
+            similar_text,
+            reply_markup=get_similar_medicines_keyboard(medicines_only)
+        )
+        await _store_last_bot_message(state, sent_message=sent)
+        return
 
     # Если похожих не найдено, продолжаем создание нового
     await state.update_data(medicine_name=name)
@@ -714,6 +705,8 @@ async def save_medicine(
         await callback.answer("✅ Сохранено!")
 
     except Exception as e:
+        # Ошибка БД здесь оставляет транзакцию непригодной - DbSessionMiddleware
+        # откатит её целиком, частично сохранённое лекарство не останется
         await callback.message.edit_text(LEXICON_RU['upload_error'])
         await callback.answer("❌ Ошибка", show_alert=True)
         logger.error(e)
@@ -1,5 +1,8 @@
+from datetime import datetime, time
+from typing import Optional
+
 from aiogram import Router, F
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.handlers.admin import IsAdmin
 from app.lexicon.lexicon_reminder import REMINDER_LEXICON_RU as L
 from app.repositoryes.ReminderRepository import ReminderRepository
+from app.repositoryes.user_repository import UserRepository
 from app.states.reminder import ReminderCreateStates, ReminderEditStates
 from app.keyboard.reminder_kb import (
     get_reminders_list_keyboard,
@@ -25,6 +29,13 @@ router.callback_query.filter(IsAdmin())
 
 # -------------------- Helpers -------------------- #
 
+def _parse_time(value: str) -> Optional[time]:
+    try:
+        return datetime.strptime(value.strip(), "%H:%M").time()
+    except ValueError:
+        return None
+
+
 async def _show_list(message, db_session: AsyncSession, user_id: int, edit: bool = True):
     repo = ReminderRepository(db_session)
     reminders = await repo.get_by_user(user_id)
@@ -69,10 +80,13 @@ async def cron_view(callback: CallbackQuery, db_session: AsyncSession):
         L["interval_one_time"] if r.is_one_time
         else L["interval_repeating"].format(days=r.interval_days)
     )
+    user = await UserRepository(db_session).get(r.user_id)
     text = L["detail"].format(
         id=r.id,
         text=r.text,
         interval=interval_text,
+        time=r.fire_time.strftime("%H:%M"),
+        tz=user.timezone if user else "UTC",
         next_fire=r.next_fire_at.strftime("%d.%m.%Y %H:%M"),
         created_at=r.created_at.strftime("%d.%m.%Y %H:%M"),
     )
@@ -117,6 +131,19 @@ async def cron_create_interval(message: Message, state: FSMContext):
         return
 
     await state.update_data(interval_days=interval)
+    await state.set_state(ReminderCreateStates.entering_time)
+    await message.answer(L["create_enter_time"], reply_markup=get_cancel_keyboard())
+
+
+@router.message(ReminderCreateStates.entering_time)
+async def cron_create_time(message: Message, state: FSMContext):
+    fire_time = _parse_time(message.text or "")
+    if fire_time is None:
+        await message.answer(L["error_invalid_time"])
+        return
+
+    # В Redis храним строкой
+    await state.update_data(fire_time=fire_time.strftime("%H:%M"))
     await state.set_state(ReminderCreateStates.choosing_type)
     await message.answer(L["create_choose_type"], reply_markup=get_reminder_type_keyboard())
 
@@ -133,6 +160,7 @@ async def cron_create_type(callback: CallbackQuery, state: FSMContext):
         text=data["text"],
         type=type_label,
         interval=data["interval_days"],
+        time=data.get("fire_time", "09:00"),
     )
     await callback.message.edit_text(text, reply_markup=get_confirm_create_keyboard())
     await callback.answer()
@@ -152,6 +180,7 @@ async def cron_save(callback: CallbackQuery, state: FSMContext, db_session: Asyn
         text=data["text"],
         interval_days=data["interval_days"],
         is_one_time=data.get("is_one_time", False),
+        fire_time=_parse_time(data.get("fire_time", "09:00")),
     )
     await state.clear()
     await callback.message.edit_text(L["create_success"])
@@ -225,6 +254,49 @@ async def cron_edit_interval_done(message: Message, state: FSMContext, db_sessio
         await message.answer(L["error_not_found"])
 
 
+@router.callback_query(ReminderEditStates.choosing_field, F.data.startswith("cron_edit_time:"))
+async def cron_edit_time_start(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(ReminderEditStates.entering_time)
+    await callback.message.edit_text(L["edit_enter_time"], reply_markup=get_cancel_keyboard())
+    await callback.answer()
+
+
+@router.message(ReminderEditStates.entering_time)
+async def cron_edit_time_done(message: Message, state: FSMContext, db_session: AsyncSession):
+    fire_time = _parse_time(message.text or "")
+    if fire_time is None:
+        await message.answer(L["error_invalid_time"])
+        return
+
+    data = await state.get_data()
+    repo = ReminderRepository(db_session)
+    result = await repo.update(data["edit_reminder_id"], fire_time=fire_time)
+    await state.clear()
+
+    if result:
+        await message.answer(L["edit_success"])
+    else:
+        await message.answer(L["error_not_found"])
+
+
+# -------------------- Timezone -------------------- #
+
+@router.message(Command("timezone"))
+async def cmd_timezone(message: Message, command: CommandObject, db_session: AsyncSession):
+    user_repo = UserRepository(db_session)
+
+    if not command.args:
+        user = await user_repo.get(message.from_user.id)
+        await message.answer(L["timezone_current"].format(tz=user.timezone if user else "UTC"))
+        return
+
+    timezone = command.args.strip()
+    if await user_repo.set_timezone(message.from_user.id, timezone):
+        await message.answer(L["timezone_set"].format(tz=timezone))
+    else:
+        await message.answer(L["timezone_invalid"].format(tz=timezone))
+
+
 # -------------------- Delete -------------------- #
 
 @router.callback_query(F.data.startswith("cron_delete:"))
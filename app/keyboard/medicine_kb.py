@@ -3,8 +3,10 @@ import enum
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from app.database.models.medicine import MedicineCategory, Medicine, MedicineKit
+from app.database.models.medicine import MedicineCategory, Medicine
 from app.lexicon.lexicon import LEXICON_RU
+from app.repositoryes.MedicineKitRepository import KitSummary
+from app.repositoryes.pagination import Page
 
 
 def get_medicine_enum_keyboard(medicines: enum.Enum, calback_prefix: str) -> InlineKeyboardMarkup:
@@ -105,19 +107,17 @@ def get_category_search_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def get_medicine_items_keyboard(items: list,
+def get_medicine_items_keyboard(page: Page,
                                 action: str = "view",
-                                page: int = 0,
-                                per_page: int = 5,
                                 page_prefix: str = "page") -> InlineKeyboardMarkup:
-    """Клавиатура со списком найденных экземпляров лекарств"""
-    builder = InlineKeyboardBuilder()
+    """Клавиатура со страницей экземпляров лекарств (keyset-пагинация).
 
-    start = page * per_page
-    end = start + per_page
-    page_items = items[start:end]
+    Навигация передаёт в callback_data курсор: {page_prefix}:{cursor}.
+    """
+    builder = InlineKeyboardBuilder()
+    page_token = page.cursor.encode()
 
-    for item in page_items:
+    for item in page.items:
         button_text = f"💊 {item.medicine.name}"
         if item.medicine.dosage:
             button_text += f" ({item.medicine.dosage})"
@@ -126,7 +126,7 @@ def get_medicine_items_keyboard(items: list,
         # Для action="view" передаем информацию о возврате в callback_data
         # Используем | как разделитель, чтобы избежать проблем с двоеточиями в page_prefix
         if action == "view":
-            callback_data = f"{action}_item:{item.id}|back|{page_prefix}|{page}"
+            callback_data = f"{action}_item:{item.id}|back|{page_prefix}|{page_token}"
         else:
             callback_data = f"{action}_item:{item.id}"
 
@@ -140,11 +140,15 @@ def get_medicine_items_keyboard(items: list,
 
     # Навигация (только если есть пагинация) - размещаем в одном ряду
     nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=f"{page_prefix}:{page - 1}"))
-    if end < len(items):
-        nav_buttons.append(InlineKeyboardButton(text="Вперед ▶️", callback_data=f"{page_prefix}:{page + 1}"))
-    
+    if page.items and page.has_prev:
+        nav_buttons.append(InlineKeyboardButton(
+            text="◀️ Назад", callback_data=f"{page_prefix}:{page.prev_cursor.encode()}"
+        ))
+    if page.items and page.has_next:
+        nav_buttons.append(InlineKeyboardButton(
+            text="Вперед ▶️", callback_data=f"{page_prefix}:{page.next_cursor.encode()}"
+        ))
+
     if nav_buttons:
         builder.row(*nav_buttons)
 
@@ -153,7 +157,7 @@ def get_medicine_items_keyboard(items: list,
     return builder.as_markup()
 
 
-def get_share_kit_keyboard(kits: list[MedicineKit]) -> InlineKeyboardMarkup:
+def get_share_kit_keyboard(kits: list[KitSummary]) -> InlineKeyboardMarkup:
     """Клавиатура для выбора аптечки для шаринга"""
     builder = InlineKeyboardBuilder()
 
@@ -252,7 +256,7 @@ def get_confirm_delete_item_keyboard(item_id: int) -> InlineKeyboardMarkup:
 
 def get_back_to_kit_keyboard(
     back_prefix: str = None,
-    back_page: int = 0,
+    back_page: str = "0",
     item_id: int | None = None,
 ) -> InlineKeyboardMarkup:
     """Клавиатура для карточки лекарства: назад, обновить, удалить, закрыть"""
@@ -45,6 +45,7 @@ def get_edit_field_keyboard(reminder_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text=L["btn_edit_text"], callback_data=f"cron_edit_text:{reminder_id}")
     builder.button(text=L["btn_edit_interval"], callback_data=f"cron_edit_interval:{reminder_id}")
+    builder.button(text=L["btn_edit_time"], callback_data=f"cron_edit_time:{reminder_id}")
     builder.row(InlineKeyboardButton(text=L["btn_cancel"], callback_data="cron_cancel"))
     builder.adjust(2)
     return builder.as_markup()
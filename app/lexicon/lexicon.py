@@ -3,7 +3,7 @@ LEXICON_COMMANDS_RU: dict[str, str] = {
     '/manual': 'Краткий мануал по боту',
     '/upload': 'Добавить лекарство',
     '/my_kits': 'Мои аптечки',
-    '/find': 'Поиск по категории',
+    '/find': 'Поиск по категории или тексту',
     '/delete_kits': 'Удаление аптечки/ корзина аптечек',
     '/expired': 'Просроченные лекарства',
     '/share': 'Поделиться аптечкой',
@@ -18,7 +18,7 @@ LEXICON_RU: dict[str, str | dict[str, str]] = {
                '1) Создай первую аптечку: /upload → выбери существующую или введи новое название.\n'
                '2) Добавь лекарство: укажи название, тип, категорию,кол-во действующего вещества, количество, срок годности и место хранения. Можно пропускать шаги там, где есть кнопка "Пропустить".\n'
                '3) Посмотри свои аптечки: /my_kits — список активных, /delete_kits удалённых (корзина).\n'
-               '4) Для поиска лекарства просто пиши название или его часть боту. Найти лекарства по категории: /find. Просроченные — /expired.\n'
+               '4) Для поиска лекарства просто пиши название или его часть боту. Найти лекарства по категории: /find, по заметкам и месту хранения: /find в холодильнике. Просроченные — /expired.\n'
                '5) Обнови данные по лекарству: /update (количество, место, заметки). Удалить — /del.\n'
                '6) Поделись аптечкой с другом: /share — отправь username без @.\n'
                '7) Если что-то пошло не так, всегда можно вернуться в начало команды или вызвать /help и /manual.\n\n'
@@ -79,10 +79,13 @@ LEXICON_RU: dict[str, str | dict[str, str]] = {
     'find_choose_category': '🔍 Выберите категорию для поиска:',
     'find_results': '📋 Найдено лекарств: {count}\n\n',
     'find_no_results': '❌ Лекарств этой категории не найдено',
+    'find_text_results': '🔍 По запросу "{query}" найдено: {count}\n\n',
+    'find_text_no_results': '❌ По запросу "{query}" ничего не найдено',
 
     # Поиск по названию
     'search_results': '🔍 Найдено "{query}":\n\n',
     'search_no_results': '❌ Лекарство "{query}" не найдено в ваших аптечках',
+    'search_expired': '⌛ Результаты поиска устарели, повторите поиск',
     'search_item_info': '💊 {name}\n'
                         '🏷 {type} - {category}\n'
                         '💉 кол-во действующего вещества: {dosage}\n'
@@ -92,7 +95,7 @@ LEXICON_RU: dict[str, str | dict[str, str]] = {
                         '📦 Аптечка: {kit_name}\n',
 
     # Просроченные
-    'expired_list': '⚠️ Просроченные лекарства:\n\n',
+    'expired_list': '⚠️ Просроченные лекарства ({count}):\n\n',
     'expired_no_items': '✅ Просроченных лекарств не найдено!',
     'expired_item': '❌ {name} ({dosage})\n'
                     '   Срок годности: {expiry}\n'
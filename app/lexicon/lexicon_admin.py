@@ -1,16 +1,18 @@
 LEXICON_COMMANDS_RU: dict[str, str] = {
     '/check_not_verify' : 'Проверить подозрительные лекарства',
+    '/dedup': 'Сверить список названий со справочником',
     '/help': 'Список команд',
     '/upload': 'Добавить лекарство',
     '/my_kits': 'Мои аптечки',
     '/delete_kits': 'Удаление аптечки/ корзина аптечек',
-    '/find': 'Поиск по категории',
+    '/find': 'Поиск по категории или тексту',
     '/expired': 'Просроченные лекарства',
     '/share': 'Поделиться аптечкой',
     '/update': 'Обновить лекарство',
     '/del': 'Удалить лекарство',
     '/broadcast': 'Рассылка сообщения всем пользователям',
     '/crons' : 'Напоминания',
+    '/timezone': 'Часовой пояс напоминаний',
     '/send_private': 'Личное сообщение пользователю',
 }
 
@@ -33,4 +35,12 @@ LEXICON_RU: dict[str, str] = {
     'cancelled': 'Отменено',
     'pagination_prev': '◀️ Назад',
     'pagination_next': 'Вперед ▶️',
+    'dedup_usage': 'Отправьте /dedup и названия лекарств, по одному в строке, '
+                   'или .txt-файл с подписью /dedup',
+    'dedup_summary': '📋 Сверка со справочником: {total}\n'
+                     '✅ Уже есть: {link}\n'
+                     '⚠️ Похожи, нужна проверка: {flag}\n'
+                     '🆕 Новые: {new}',
+    'dedup_flag_title': '⚠️ Нужна проверка:',
+    'dedup_new_title': '🆕 Новые:',
 }
\ No newline at end of file
@@ -10,7 +10,8 @@ REMINDER_LEXICON_RU: dict[str, str] = {
         "🔔 Напоминание #{id}\n\n"
         "📝 Текст: {text}\n"
         "🔁 Интервал: {interval}\n"
-        "📅 Следующее: {next_fire}\n"
+        "🕘 Время: {time} ({tz})\n"
+        "📅 Следующее: {next_fire} UTC\n"
         "📆 Создано: {created_at}"
     ),
     "interval_repeating": "каждые {days} дн.",
@@ -19,13 +20,14 @@ REMINDER_LEXICON_RU: dict[str, str] = {
     # Создание
     "create_enter_text": "📝 Введите текст напоминания:",
     "create_enter_interval": "🔢 Введите интервал в днях (целое число > 0):",
+    "create_enter_time": "🕘 Введите время напоминания в формате ЧЧ:ММ (по вашему часовому поясу, см. /timezone):",
     "create_choose_type": "🔁 Выберите тип напоминания:",
     "create_confirm": (
         "✅ Проверьте напоминание:\n\n"
         "📝 Текст: {text}\n"
         "🔁 Тип: {type}\n"
         "🔢 Интервал: {interval} дн.\n"
-        "📅 Первое срабатывание: ~через {interval} дн. в 09:00\n\n"
+        "📅 Первое срабатывание: ~через {interval} дн. в {time}\n\n"
         "Сохранить?"
     ),
     "create_success": "✅ Напоминание создано!",
@@ -35,8 +37,14 @@ REMINDER_LEXICON_RU: dict[str, str] = {
     "edit_choose_field": "✏️ Что изменить?",
     "edit_enter_text": "📝 Введите новый текст напоминания:",
     "edit_enter_interval": "🔢 Введите новый интервал в днях (целое число > 0):",
+    "edit_enter_time": "🕘 Введите новое время в формате ЧЧ:ММ:",
     "edit_success": "✅ Напоминание обновлено!",
 
+    # Часовой пояс
+    "timezone_current": "🌍 Ваш часовой пояс: {tz}\n\nЧтобы изменить, отправьте /timezone Europe/Moscow",
+    "timezone_set": "✅ Часовой пояс установлен: {tz}",
+    "timezone_invalid": "❌ Неизвестный часовой пояс: {tz}\n\nПример: /timezone Europe/Moscow",
+
     # Удаление
     "delete_confirm": "⚠️ Удалить напоминание?\n\n📝 {text}",
     "delete_success": "✅ Напоминание удалено.",
@@ -44,11 +52,14 @@ REMINDER_LEXICON_RU: dict[str, str] = {
 
     # Валидация
     "error_invalid_interval": "❌ Введите целое число больше 0.",
+    "error_invalid_time": "❌ Введите время в формате ЧЧ:ММ, например 09:00.",
     "error_text_empty": "❌ Текст не может быть пустым.",
     "error_not_found": "❌ Напоминание не найдено.",
 
     # Уведомление
     "notification": "🔔 Напоминание:\n\n{text}",
+    "notification_many": "🔔 Напоминания ({count}):\n\n{items}",
+    "notification_item": "• {text}\n",
 
     # Кнопки
     "btn_add": "➕ Добавить",
@@ -61,6 +72,7 @@ REMINDER_LEXICON_RU: dict[str, str] = {
     "btn_one_time": "1️⃣ Однократное",
     "btn_edit_text": "📝 Текст",
     "btn_edit_interval": "🔢 Интервал",
+    "btn_edit_time": "🕘 Время",
     "btn_confirm_delete": "⚠️ Да, удалить",
     "btn_close": "❌ Закрыть",
 }
@@ -6,6 +6,18 @@ from app.database.psql import AsyncSessionLocal
 
 
 class DbSessionMiddleware(BaseMiddleware):
+    """Сессия БД на апдейт: одна транзакция, коммит после хэндлера.
+
+    Репозитории только flush-ат изменения, поэтому многошаговая запись хэндлера
+    атомарна. При исключении транзакция откатывается, как и в случае, когда
+    хэндлер сам поймал ошибку БД и завершился штатно. Долгим хэндлерам
+    (рассылка) можно вызвать db_session.commit() самим, чтобы раньше отпустить
+    соединение - следующий запрос откроет новую транзакцию.
+
+    Сама сессия ленивая: соединение из пула берётся на первом запросе, так что
+    апдейты без обращения к БД (close, cancel_*, FSM-экраны) пул не трогают.
+    """
+
     async def __call__(
         self,
         handler: Callable,
@@ -14,4 +26,15 @@ class DbSessionMiddleware(BaseMiddleware):
     ) -> Any:
         async with AsyncSessionLocal() as session:
             data["db_session"] = session
-            return await handler(event, data)
+            try:
+                result = await handler(event, data)
+                if session.is_active:
+                    await session.commit()
+                else:
+                    # Хэндлер сам обработал ошибку flush - транзакция уже
+                    # непригодна, фиксировать нечего
+                    await session.rollback()
+            except Exception:
+                await session.rollback()
+                raise
+            return result
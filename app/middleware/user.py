@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import Callable, Dict, Any, Optional
 
 from aiogram import BaseMiddleware
@@ -6,10 +7,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositoryes.user_repository import UserRepository
 
+# Сколько уже проверенных пользователей помнить в процессе
+KNOWN_USERS_CACHE_SIZE = 10_000
+
 
 class UserCheckMiddleware(BaseMiddleware):
-    def __init__(self, create_if_missing: bool = False):
+    def __init__(self, create_if_missing: bool = False, cache_size: int = KNOWN_USERS_CACHE_SIZE):
         self.create_if_missing = create_if_missing
+        self.cache_size = cache_size
+        # Пользователи, уже найденные в БД. Для них проверка не делает запрос,
+        # и апдейт без работы с БД не берёт соединение из пула
+        self._known: OrderedDict[int, None] = OrderedDict()
 
     async def __call__(
         self,
@@ -44,10 +52,16 @@ class UserCheckMiddleware(BaseMiddleware):
             if first_token.startswith('/start'):
                 return await handler(event, data)
 
+        if user_id in self._known:
+            self._known.move_to_end(user_id)
+            return await handler(event, data)
+
         user_repo = UserRepository(db_session)
         user = await user_repo.get(user_id)
 
-        if not user:
+        if user:
+            self._remember(user_id)
+        else:
             if self.create_if_missing:
                 await user_repo.create(user_id, username)
             else:
@@ -61,3 +75,8 @@ class UserCheckMiddleware(BaseMiddleware):
                 return
 
         return await handler(event, data)
+
+    def _remember(self, user_id: int):
+        self._known[user_id] = None
+        while len(self._known) > self.cache_size:
+            self._known.popitem(last=False)
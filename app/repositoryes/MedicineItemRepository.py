@@ -2,15 +2,28 @@ from typing import Optional, List
 from datetime import date, timedelta
 from decimal import Decimal
 import logging
-
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
-
-from app.database.models.medicine import MedicineItem, Medicine
+import re
+
+from sqlalchemy import select, and_, func, tuple_, cast, union
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import contains_eager, selectinload
+
+from app.database.models.medicine import (
+    MedicineItem,
+    Medicine,
+    MedicineKit,
+    MedicineCategory,
+    user_medicine_kit_association,
+)
+from app.repositoryes.pagination import Cursor, FIRST_PAGE, Page
 from app.repositoryes.template import TemplateRepository
+from app.utils.medicine_names import normalize_medicine_name
 
 log = logging.getLogger(__name__)
 
+# Слова запроса для to_tsquery: только буквы и цифры, без операторов tsquery
+_WORD_RE = re.compile(r"[^\W_]+")
+
 
 class MedicineItemRepository(TemplateRepository):
     """Репозиторий для работы с экземплярами лекарств в аптечке"""
@@ -144,7 +157,7 @@ class MedicineItemRepository(TemplateRepository):
         )
 
         self.db.add(new_item)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(new_item, ["medicine", "medicine_kit"])
 
         return new_item
@@ -174,7 +187,7 @@ class MedicineItemRepository(TemplateRepository):
         if notes is not None:
             item.notes = notes
 
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(item)
 
         return item
@@ -195,7 +208,7 @@ class MedicineItemRepository(TemplateRepository):
         if item.quantity < 0:
             item.quantity = Decimal("0")
 
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(item)
 
         return item
@@ -207,7 +220,7 @@ class MedicineItemRepository(TemplateRepository):
             return False
 
         await self.db.delete(item)
-        await self.db.commit()
+        await self.db.flush()
 
         return True
 
@@ -216,17 +229,262 @@ class MedicineItemRepository(TemplateRepository):
             kit_id: int,
             search_term: str
     ) -> List[MedicineItem]:
-        """Поиск лекарств в аптечке"""
+        """Полнотекстовый поиск лекарств в аптечке, лучшие совпадения первыми"""
+        ts_query = _ts_query(search_term)
+        if ts_query is None:
+            return []
+        query = (
+            _full_text_query(select(MedicineItem).join(MedicineItem.medicine), ts_query)
+            .where(MedicineItem.medicine_kit_id == kit_id)
+            .order_by(_ts_rank(ts_query).desc(), Medicine.name, MedicineItem.id)
+            .options(contains_eager(MedicineItem.medicine))
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def full_text_ids_for_user(
+            self,
+            user_id: int,
+            search_term: str,
+            limit: int = 1000
+    ) -> List[int]:
+        """Полнотекстовый поиск по всем аптечкам пользователя: id в порядке релевантности.
+
+        Ищет по названию, дозировке и заметкам лекарства, месту хранения и
+        заметкам экземпляра ("в холодильнике", "от головы").
+        """
+        ts_query = _ts_query(search_term)
+        if ts_query is None:
+            return []
+        query = (
+            _user_items_query(_full_text_query(select(MedicineItem.id), ts_query), user_id)
+            .order_by(_ts_rank(ts_query).desc(), Medicine.name, MedicineItem.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def page_by_kit(
+            self,
+            kit_id: int,
+            cursor: Cursor = FIRST_PAGE,
+            per_page: int = 5,
+            with_total: bool = False
+    ) -> Page[MedicineItem]:
+        """Страница лекарств аптечки (keyset по названию и id)"""
         query = (
             select(MedicineItem)
-            .join(Medicine)
-            .where(
-                and_(
-                    MedicineItem.medicine_kit_id == kit_id,
-                    Medicine.name.ilike(f"%{search_term}%")
-                )
+            .join(MedicineItem.medicine)
+            .where(MedicineItem.medicine_kit_id == kit_id)
+        )
+        total = None
+        if with_total:
+            total = await self._count(
+                select(func.count()).select_from(MedicineItem).where(MedicineItem.medicine_kit_id == kit_id)
             )
+        return await self._keyset_page(query, cursor, per_page, total)
+
+    async def page_for_user(
+            self,
+            user_id: int,
+            cursor: Cursor = FIRST_PAGE,
+            per_page: int = 5,
+            is_expired: bool = False
+    ) -> Page[MedicineItem]:
+        """Страница лекарств из всех аптечек пользователя (keyset по названию и id)"""
+        query = _user_items_query(select(MedicineItem), user_id, is_expired=is_expired)
+        return await self._keyset_page(query, cursor, per_page)
+
+    async def expired_for_user(
+            self,
+            user_id: int,
+            cursor: Cursor = FIRST_PAGE,
+            per_page: int = 5
+    ) -> Page[MedicineItem]:
+        """Просроченные лекарства из всех аптечек пользователя: страница и общее количество.
+
+        Сначала самые давно просроченные (keyset по сроку годности и id);
+        фильтр по аптечкам и сроку идёт по индексу (medicine_kit_id, expiry_date).
+        Число запросов не зависит от количества аптечек.
+        """
+        query = _user_items_query(select(MedicineItem), user_id, is_expired=True)
+        total = await self._count(
+            _user_items_query(select(func.count()).select_from(MedicineItem), user_id, is_expired=True)
+        )
+        return await self._keyset_page(
+            query, cursor, per_page, total, order_by=(MedicineItem.expiry_date, MedicineItem.id)
+        )
+
+    async def search_for_user(
+            self,
+            user_id: int,
+            category: Optional[MedicineCategory] = None,
+            name: Optional[str] = None,
+            cursor: Cursor = FIRST_PAGE,
+            per_page: int = 5
+    ) -> Page[MedicineItem]:
+        """Поиск по всем аптечкам пользователя: страница результатов и общее количество.
+
+        user_medicine_kits -> medicine_items -> medicines с фильтрами в SQL:
+        страница берётся keyset-запросом, количество - отдельным count(*).
+        """
+        query = _user_items_query(select(MedicineItem), user_id, category=category, name=name)
+        total = await self._count(
+            _user_items_query(select(func.count()).select_from(MedicineItem), user_id, category=category, name=name)
+        )
+        return await self._keyset_page(query, cursor, per_page, total)
+
+    async def search_ids_for_user(
+            self,
+            user_id: int,
+            category: Optional[MedicineCategory] = None,
+            name: Optional[str] = None,
+            limit: int = 1000
+    ) -> List[int]:
+        """id всех найденных экземпляров в порядке (название, id) - для кэша результатов"""
+        query = (
+            _user_items_query(select(MedicineItem.id), user_id, category=category, name=name)
+            .order_by(Medicine.name, MedicineItem.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_many(self, item_ids: List[int]) -> List[MedicineItem]:
+        """Экземпляры по списку id в том же порядке (удалённые пропускаются)"""
+        if not item_ids:
+            return []
+        query = (
+            select(MedicineItem)
+            .where(MedicineItem.id.in_(item_ids))
             .options(selectinload(MedicineItem.medicine))
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        items = {item.id: item for item in result.scalars().all()}
+        return [items[item_id] for item_id in item_ids if item_id in items]
+
+    async def _count(self, query) -> int:
+        result = await self.db.execute(query)
+        return result.scalar_one()
+
+    async def _keyset_page(
+            self,
+            query,
+            cursor: Cursor,
+            per_page: int,
+            total: Optional[int] = None,
+            order_by: tuple = (Medicine.name, MedicineItem.id)
+    ) -> Page[MedicineItem]:
+        """Страница запроса (уже с join на medicines) в порядке order_by.
+
+        order_by - колонки сортировки, последняя - MedicineItem.id (по умолчанию
+        название и id). Положение курсора берётся подзапросами по id элемента,
+        поэтому в callback_data достаточно id. Выбирается per_page + 1 строка,
+        лишняя говорит о наличии следующей (предыдущей) страницы.
+        """
+        sort_key = tuple_(*order_by)
+        paged = query.options(contains_eager(MedicineItem.medicine))
+
+        if cursor.before is not None:
+            paged = paged.where(sort_key < _sort_position(order_by, cursor.before)).order_by(
+                *(column.desc() for column in order_by)
+            )
+        else:
+            if cursor.after is not None:
+                paged = paged.where(sort_key > _sort_position(order_by, cursor.after))
+            paged = paged.order_by(*order_by)
+
+        result = await self.db.execute(paged.limit(per_page + 1))
+        items = list(result.scalars().all())
+        has_more = len(items) > per_page
+        items = items[:per_page]
+
+        if not items and not cursor.is_first:
+            # Элемент курсора удалён или страница опустела - начинаем сначала
+            return await self._keyset_page(query, FIRST_PAGE, per_page, total, order_by)
+
+        if cursor.before is not None:
+            items.reverse()
+            return Page(items=items, cursor=cursor, has_next=True, has_prev=has_more, total=total)
+        return Page(items=items, cursor=cursor, has_next=has_more, has_prev=cursor.after is not None, total=total)
+
+
+def _sort_position(order_by: tuple, item_id: int):
+    """Значения колонок сортировки для элемента курсора (скалярные подзапросы)"""
+    return tuple_(*(
+        item_id if column is MedicineItem.id else (
+            select(column)
+            .select_from(MedicineItem)
+            .join(MedicineItem.medicine)
+            .where(MedicineItem.id == item_id)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        for column in order_by
+    ))
+
+
+def _ts_query(search_term: str):
+    """tsquery по словам запроса: все слова как префиксы, в русской морфологии
+    или дословно (simple). None - в запросе нет ни одного слова.
+    """
+    words = _WORD_RE.findall(search_term.lower())
+    if not words:
+        return None
+    expression = " & ".join(f"{word}:*" for word in words)
+    return func.to_tsquery(cast("russian", REGCONFIG), expression).op("||")(
+        func.to_tsquery(cast("simple", REGCONFIG), expression)
+    )
+
+
+def _ts_rank(ts_query):
+    """Релевантность экземпляра: совпадения в лекарстве и в самом экземпляре"""
+    return func.ts_rank(Medicine.search_vector, ts_query) + func.ts_rank(MedicineItem.search_vector, ts_query)
+
+
+def _full_text_query(query, ts_query):
+    """Фильтр по tsquery. Совпадения в medicine_items и в medicines ищутся
+    отдельными подзапросами (UNION id), чтобы каждый шёл по своему GIN-индексу.
+    """
+    matched_ids = union(
+        select(MedicineItem.id).where(MedicineItem.search_vector.bool_op("@@")(ts_query)),
+        select(MedicineItem.id)
+        .join(MedicineItem.medicine)
+        .where(Medicine.search_vector.bool_op("@@")(ts_query)),
+    )
+    return query.where(MedicineItem.id.in_(matched_ids))
+
+
+def _user_items_query(
+        query,
+        user_id: int,
+        category: Optional[MedicineCategory] = None,
+        name: Optional[str] = None,
+        is_expired: bool = False
+):
+    """Лекарства из всех (не удалённых) аптечек пользователя с фильтрами"""
+    filters = [
+        user_medicine_kit_association.c.user_id == user_id,
+        MedicineKit.deleted == False,
+    ]
+    if category is not None:
+        filters.append(Medicine.category == category)
+    if name is not None:
+        key = normalize_medicine_name(name)
+        if key:
+            filters.append(Medicine.search_key.contains(key, autoescape=True))
+        else:
+            filters.append(Medicine.name.ilike(f"%{name}%"))
+    if is_expired:
+        filters.append(MedicineItem.expiry_date < date.today())
+
+    return (
+        query
+        .join(MedicineItem.medicine)
+        .join(MedicineKit, MedicineKit.id == MedicineItem.medicine_kit_id)
+        .join(
+            user_medicine_kit_association,
+            user_medicine_kit_association.c.medicine_kit_id == MedicineItem.medicine_kit_id
+        )
+        .where(and_(*filters))
+    )
@@ -1,16 +1,29 @@
+from dataclasses import dataclass
+from datetime import date
 from typing import Optional, List
 import logging
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, exists, func
 from sqlalchemy.orm import selectinload
 
-from app.database.models.medicine import MedicineKit, MedicineItem
+from app.database.models.medicine import MedicineKit, MedicineItem, user_medicine_kit_association
 from app.database.models.users import User
 from app.repositoryes.template import TemplateRepository
 
 log = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class KitSummary:
+    """Аптечка для списков и клавиатур выбора - без загрузки лекарств и пользователей"""
+    id: int
+    name: str
+    description: Optional[str]
+    item_count: int
+    expired_count: int
+    user_count: int
+
+
 class MedicineKitRepository(TemplateRepository):
     """Репозиторий для работы с аптечками"""
 
@@ -21,8 +34,9 @@ class MedicineKitRepository(TemplateRepository):
             deleted: Optional[bool] = None,
             page: Optional[int] = None,
             per_page: Optional[int] = None,
+            with_relations: bool = False,
         ) -> List[MedicineKit]:
-        """Получить все аптечки с фильтрами"""
+        """Получить все аптечки с фильтрами (with_relations=True - с пользователями и лекарствами)"""
         query = select(MedicineKit)
         filters = []
 
@@ -41,11 +55,12 @@ class MedicineKitRepository(TemplateRepository):
 
         if filters:
             query = query.where(and_(*filters))
-        
-        query = query.options(
-            selectinload(MedicineKit.users),
-            selectinload(MedicineKit.items).selectinload(MedicineItem.medicine)
-        )
+
+        if with_relations:
+            query = query.options(
+                selectinload(MedicineKit.users),
+                selectinload(MedicineKit.items).selectinload(MedicineItem.medicine)
+            )
 
         # Apply pagination if requested
         if page is not None and per_page is not None:
@@ -54,18 +69,71 @@ class MedicineKitRepository(TemplateRepository):
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get(self, kit_id: int) -> Optional[MedicineKit]:
-        """Получить аптечку по ID"""
-        query = select(MedicineKit).where(MedicineKit.id == kit_id).options(
-            selectinload(MedicineKit.users),
-            selectinload(MedicineKit.items).selectinload(MedicineItem.medicine)
-        )
+    async def get(self, kit_id: int, with_relations: bool = True) -> Optional[MedicineKit]:
+        """Получить аптечку по ID (with_relations=False - без пользователей и лекарств)"""
+        query = select(MedicineKit).where(MedicineKit.id == kit_id)
+        if with_relations:
+            query = query.options(
+                selectinload(MedicineKit.users),
+                selectinload(MedicineKit.items).selectinload(MedicineItem.medicine)
+            )
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_by_user(self, user_id: int, deleted: Optional[bool] = None) -> List[MedicineKit]:
+    async def get_by_user(
+            self,
+            user_id: int,
+            deleted: Optional[bool] = None,
+            with_relations: bool = False
+    ) -> List[MedicineKit]:
         """Получить все аптечки пользователя (можно фильтровать по удалённым)"""
-        return await self.get_all(user_id=user_id, deleted=deleted)
+        return await self.get_all(user_id=user_id, deleted=deleted, with_relations=with_relations)
+
+    async def get_summaries(self, user_id: int, deleted: bool = False) -> List[KitSummary]:
+        """Аптечки пользователя с количеством лекарств, просроченных и пользователей.
+
+        Один агрегирующий запрос вместо загрузки всех лекарств и пользователей
+        каждой аптечки - для экранов выбора аптечки и списков.
+        """
+        user_count = (
+            select(func.count())
+            .where(user_medicine_kit_association.c.medicine_kit_id == MedicineKit.id)
+            .correlate(MedicineKit)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                MedicineKit.id,
+                MedicineKit.name,
+                MedicineKit.description,
+                func.count(MedicineItem.id),
+                func.count(MedicineItem.id).filter(MedicineItem.expiry_date < date.today()),
+                user_count,
+            )
+            .join(
+                user_medicine_kit_association,
+                user_medicine_kit_association.c.medicine_kit_id == MedicineKit.id
+            )
+            .outerjoin(MedicineItem, MedicineItem.medicine_kit_id == MedicineKit.id)
+            .where(
+                user_medicine_kit_association.c.user_id == user_id,
+                MedicineKit.deleted == deleted,
+            )
+            .group_by(MedicineKit.id)
+            .order_by(MedicineKit.id)
+        )
+        result = await self.db.execute(query)
+        return [KitSummary(*row) for row in result.all()]
+
+    async def has_kits(self, user_id: int) -> bool:
+        """Есть ли у пользователя хотя бы одна (не удалённая) аптечка"""
+        query = select(exists().where(
+            user_medicine_kit_association.c.user_id == user_id,
+            user_medicine_kit_association.c.medicine_kit_id == MedicineKit.id,
+            MedicineKit.deleted == False,
+        ))
+        result = await self.db.execute(query)
+        return result.scalar()
 
     async def create(
             self,
@@ -82,7 +150,7 @@ class MedicineKitRepository(TemplateRepository):
             new_kit.users = list(users.scalars().all())
 
         self.db.add(new_kit)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(new_kit, ["users", "items"])
 
         return new_kit
@@ -106,7 +174,7 @@ class MedicineKitRepository(TemplateRepository):
         if deleted is not None:
             kit.deleted = deleted
 
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(kit)
 
         return kit
@@ -121,7 +189,7 @@ class MedicineKitRepository(TemplateRepository):
 
         if user not in kit.users:
             kit.users.append(user)
-            await self.db.commit()
+            await self.db.flush()
 
         return True
 
@@ -135,7 +203,7 @@ class MedicineKitRepository(TemplateRepository):
 
         if user in kit.users:
             kit.users.remove(user)
-            await self.db.commit()
+            await self.db.flush()
 
         return True
 
@@ -146,6 +214,6 @@ class MedicineKitRepository(TemplateRepository):
             return False
 
         await self.db.delete(kit)
-        await self.db.commit()
+        await self.db.flush()
 
         return True
\ No newline at end of file
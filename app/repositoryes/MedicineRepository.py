@@ -1,14 +1,24 @@
-from typing import Optional, List
+from typing import Callable, Optional, List
 import logging
 
-from sqlalchemy import select, and_
+from rapidfuzz import fuzz, process
+from sqlalchemy import select, and_, func, union
 
 from app.database.models.medicine import Medicine, MedicineType, MedicineCategory
 from app.repositoryes.template import TemplateRepository
 from app.utils.flags import Flags
+from app.utils.medicine_index import MedicineEntry, medicine_index
+from app.utils.medicine_names import normalize_medicine_name
+from app.utils.similar_cache import similar_cache
 
 log = logging.getLogger(__name__)
 
+# Сколько кандидатов отбирать триграммным индексом перед переранжированием
+SIMILAR_CANDIDATES = 50
+# Порог word_similarity для запросов из одного слова (по умолчанию в pg_trgm 0.6
+# отсекает слово с одной опечаткой: «нурафен» / «нурофен форте» - 0.45)
+SIMILAR_WORD_THRESHOLD = 0.4
+
 
 class MedicineRepository(TemplateRepository):
     """Репозиторий для работы со справочником лекарств"""
@@ -26,7 +36,13 @@ class MedicineRepository(TemplateRepository):
         filters = []
 
         if name is not None:
-            filters.append(Medicine.name.ilike(f"%{name}%"))
+            # Поиск по нормализованному ключу (триграммный индекс); если от запроса
+            # после нормализации ничего не осталось - по сырому названию
+            key = normalize_medicine_name(name)
+            if key:
+                filters.append(Medicine.search_key.contains(key, autoescape=True))
+            else:
+                filters.append(Medicine.name.ilike(f"%{name}%"))
         if medicine_type is not None:
             filters.append(Medicine.medicine_type == medicine_type)
         if category is not None:
@@ -48,6 +64,86 @@ class MedicineRepository(TemplateRepository):
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_verified_entries(self) -> List[MedicineEntry]:
+        """Верифицированные лекарства для индекса похожих (только нужные поля)"""
+        query = select(
+            Medicine.id, Medicine.name, Medicine.dosage, Medicine.medicine_type, Medicine.category
+        ).where(Medicine.flags.op('&')(Flags.VERIFIED) != 0)
+        result = await self.db.execute(query)
+        return [MedicineEntry(*row) for row in result.all()]
+
+    async def get_entries(self, medicine_ids: List[int]) -> List[MedicineEntry]:
+        """Верифицированные лекарства по списку id (для кэша похожих)"""
+        if not medicine_ids:
+            return []
+        query = select(
+            Medicine.id, Medicine.name, Medicine.dosage, Medicine.medicine_type, Medicine.category
+        ).where(
+            Medicine.id.in_(medicine_ids),
+            Medicine.flags.op('&')(Flags.VERIFIED) != 0,
+        )
+        result = await self.db.execute(query)
+        return [MedicineEntry(*row) for row in result.all()]
+
+    async def find_similar(
+            self,
+            name: str,
+            limit: int = 3,
+            score_cutoff: float = 0
+    ) -> List[tuple[MedicineEntry, float]]:
+        """Похожие верифицированные лекарства: список (MedicineEntry, score).
+
+        Сравниваются нормализованные ключи: кандидаты отбираются в Postgres
+        оператором pg_trgm `%` по GIN-индексу ix_medicines_search_key_trgm,
+        затем переранжируются fuzz.WRatio. Стоимость не зависит от размера
+        справочника.
+
+        Для запроса из одного слова similarity с длинным названием мала
+        («нурофен» / «нурофен экспресс форте» - 0.35), поэтому к кандидатам
+        добавляются найденные по word_similarity (`%>`, тот же GIN-индекс).
+        """
+        key = normalize_medicine_name(name)
+        if not key:
+            return []
+
+        columns = (
+            Medicine.id, Medicine.name, Medicine.dosage, Medicine.medicine_type, Medicine.category,
+            Medicine.search_key,
+        )
+        verified = Medicine.flags.op('&')(Flags.VERIFIED) != 0
+        query = (
+            select(*columns)
+            .where(Medicine.search_key.op('%')(key), verified)
+            .order_by(func.similarity(Medicine.search_key, key).desc())
+            .limit(SIMILAR_CANDIDATES)
+        )
+        if " " not in key:
+            # Порог только на текущую транзакцию
+            await self.db.execute(
+                select(func.set_config('pg_trgm.word_similarity_threshold', str(SIMILAR_WORD_THRESHOLD), True))
+            )
+            by_word = (
+                select(*columns)
+                .where(Medicine.search_key.op('%>')(key), verified)
+                .order_by(func.word_similarity(key, Medicine.search_key).desc())
+                .limit(SIMILAR_CANDIDATES)
+            )
+            query = union(query, by_word)
+        result = await self.db.execute(query)
+        rows = result.all()
+        if not rows:
+            return []
+
+        matches = process.extract(
+            key,
+            [row.search_key for row in rows],
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=limit,
+            score_cutoff=score_cutoff,
+        )
+        return [(MedicineEntry(*rows[idx][:5]), score) for _, score, idx in matches]
+
     async def get(self, medicine_id: int) -> Optional[Medicine]:
         """Получить лекарство по ID"""
         return await self.db.get(Medicine, medicine_id)
@@ -77,6 +173,7 @@ class MedicineRepository(TemplateRepository):
 
         new_medicine = Medicine(
             name=name,
+            search_key=normalize_medicine_name(name),
             medicine_type=medicine_type,
             category=category,
             dosage=dosage,
@@ -85,8 +182,9 @@ class MedicineRepository(TemplateRepository):
         )
 
         self.db.add(new_medicine)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(new_medicine)
+        self.on_commit(_sync_index(new_medicine.id, _verified_entry(new_medicine)))
 
         return new_medicine
 
@@ -104,9 +202,11 @@ class MedicineRepository(TemplateRepository):
         medicine = await self.get(medicine_id)
         if not medicine:
             return None
+        previous = _verified_entry(medicine)
 
         if name is not None:
             medicine.name = name
+            medicine.search_key = normalize_medicine_name(name)
 
         # Если flags переданы явно, устанавливаем их (бизнес-логика по вычислению флагов
         # должна происходить на уровне хэндлера)
@@ -124,8 +224,9 @@ class MedicineRepository(TemplateRepository):
         if notes is not None:
             medicine.notes = notes
 
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(medicine)
+        self.on_commit(_sync_index(medicine.id, _verified_entry(medicine), previous))
 
         return medicine
 
@@ -135,8 +236,10 @@ class MedicineRepository(TemplateRepository):
         if not medicine:
             return False
 
+        previous = _verified_entry(medicine)
         await self.db.delete(medicine)
-        await self.db.commit()
+        await self.db.flush()
+        self.on_commit(_sync_index(medicine_id, None, previous))
 
         return True
 
@@ -148,14 +251,26 @@ class MedicineRepository(TemplateRepository):
             dosage: Optional[str] = None,
             flags: Optional[int] = None
     ) -> Medicine:
-        """Получить существующее или создать новое лекарство"""
+        """Получить существующее или создать новое лекарство.
+
+        Совпадение ищется по нормализованному ключу: "Нурофен" и "нурофен"
+        с одной дозировкой - одно и то же лекарство.
+        """
+        key = normalize_medicine_name(name)
+        # Из "911" или "2,5%" ключа не остаётся - пустой ключ совпал бы с любым
+        # таким же лекарством, поэтому сравниваем название как есть
+        same_name = Medicine.search_key == key if key else Medicine.name == name
         query = select(Medicine).where(
-            Medicine.name == name,
+            same_name,
             Medicine.medicine_type == medicine_type,
             Medicine.dosage == dosage
-        )
+        ).order_by(
+            # Старые данные могут содержать дубли по ключу - берём верифицированное
+            (Medicine.flags.op('&')(Flags.VERIFIED) != 0).desc(),
+            Medicine.id,
+        ).limit(1)
         result = await self.db.execute(query)
-        medicine = result.scalar_one_or_none()
+        medicine = result.scalars().first()
 
         if medicine:
             return medicine
@@ -166,4 +281,39 @@ class MedicineRepository(TemplateRepository):
             category=category,
             dosage=dosage,
             flags=flags
-        )
\ No newline at end of file
+        )
+
+
+def _verified_entry(medicine: Medicine) -> Optional[MedicineEntry]:
+    """Запись для индекса похожих или None, если лекарство не верифицировано"""
+    if not Flags.from_int(medicine.flags).has(Flags.VERIFIED):
+        return None
+    return MedicineEntry(
+        id=medicine.id,
+        name=medicine.name,
+        dosage=medicine.dosage,
+        medicine_type=medicine.medicine_type,
+        category=medicine.category,
+    )
+
+
+def _sync_index(
+        medicine_id: int,
+        entry: Optional[MedicineEntry],
+        previous: Optional[MedicineEntry] = None
+) -> Callable[[], None]:
+    """Точечное обновление индекса похожих для on_commit.
+
+    entry - запись после изменения (None - лекарство удалено или не верифицировано).
+    Кэш похожих сбрасывается, только если изменилась запись верифицированного
+    справочника (заметки и прочие поля на подсказки не влияют).
+    """
+    def apply():
+        if entry is not None:
+            medicine_index.upsert(entry)
+        else:
+            medicine_index.remove(medicine_id)
+        if entry != previous:
+            similar_cache.invalidate()
+
+    return apply
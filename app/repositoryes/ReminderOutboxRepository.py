@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from typing import Optional, List
+import logging
+
+from sqlalchemy import TIMESTAMP, bindparam, delete, func, literal, or_, select, update
+
+from app.database.models.reminder import ReminderOutbox, OutboxStatus
+from app.repositoryes.template import TemplateRepository
+
+log = logging.getLogger(__name__)
+
+
+class ReminderOutboxRepository(TemplateRepository):
+    """Репозиторий очереди уведомлений о напоминаниях"""
+
+    async def claim(self, now: datetime, limit: int, lease_seconds: int) -> List[ReminderOutbox]:
+        """Забрать пачку готовых к отправке уведомлений в аренду.
+
+        Строки выбираются с FOR UPDATE SKIP LOCKED и помечаются locked_until,
+        поэтому несколько воркеров получают непересекающиеся пачки. Если воркер
+        упадёт, уведомления снова станут доступны после истечения аренды.
+        """
+        candidates = (
+            select(ReminderOutbox.id)
+            .where(
+                ReminderOutbox.status == OutboxStatus.PENDING,
+                ReminderOutbox.next_attempt_at <= now,
+                or_(ReminderOutbox.locked_until.is_(None), ReminderOutbox.locked_until <= now),
+            )
+            # user_id вторым ключом - уведомления пользователя попадают в одну пачку
+            .order_by(ReminderOutbox.next_attempt_at, ReminderOutbox.user_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(ReminderOutbox)
+            .where(ReminderOutbox.id.in_(candidates.scalar_subquery()))
+            .values(locked_until=now + timedelta(seconds=lease_seconds))
+            .returning(ReminderOutbox)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        messages = result.scalars().all()
+        await self.db.flush()
+        return messages
+
+    async def get_next_attempt_at(self) -> Optional[datetime]:
+        """Время ближайшей попытки отправки"""
+        query = select(func.min(ReminderOutbox.next_attempt_at)).where(
+            ReminderOutbox.status == OutboxStatus.PENDING
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def mark_sent(self, outbox_ids: List[int]) -> None:
+        """Доставленные уведомления удаляются из очереди"""
+        if not outbox_ids:
+            return
+        await self.db.execute(
+            delete(ReminderOutbox)
+            .where(ReminderOutbox.id.in_(outbox_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
+
+    async def mark_failed(
+        self,
+        errors: dict[int, str],
+        now: datetime,
+        max_attempts: int,
+        backoff_base: int,
+        backoff_max: int,
+    ) -> None:
+        """Запланировать повтор с экспоненциальной задержкой.
+
+        Задержка: min(backoff_base * 2^attempts, backoff_max) секунд.
+        После max_attempts попыток уведомление уходит в DEAD.
+        """
+        if not errors:
+            return
+        table = ReminderOutbox.__table__
+        delay = func.least(backoff_base * func.power(2, table.c.attempts), backoff_max)
+        query = (
+            update(table)
+            .where(table.c.id == bindparam("outbox_id"))
+            .values(
+                attempts=table.c.attempts + 1,
+                last_error=bindparam("error"),
+                next_attempt_at=literal(now, TIMESTAMP) + func.make_interval(0, 0, 0, 0, 0, 0, delay),
+                locked_until=None,
+            )
+        )
+        # executemany по Core-таблице: ORM bulk UPDATE не поддерживает WHERE
+        connection = await self.db.connection()
+        await connection.execute(
+            query,
+            [{"outbox_id": outbox_id, "error": error} for outbox_id, error in errors.items()],
+        )
+        await self.db.execute(
+            update(ReminderOutbox)
+            .where(
+                ReminderOutbox.id.in_(list(errors)),
+                ReminderOutbox.attempts >= max_attempts,
+            )
+            .values(status=OutboxStatus.DEAD)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
+
+    async def purge_dead(self, retention_days: int) -> int:
+        """Удалить DEAD-уведомления старше retention_days дней, вернуть их число.
+
+        created_at заполняется CURRENT_TIMESTAMP базы, поэтому и граница
+        считается в базе.
+        """
+        result = await self.db.execute(
+            delete(ReminderOutbox)
+            .where(
+                ReminderOutbox.status == OutboxStatus.DEAD,
+                ReminderOutbox.created_at < func.localtimestamp() - func.make_interval(0, 0, 0, retention_days),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
+        return result.rowcount
+
+    async def mark_dead(self, errors: dict[int, str]) -> None:
+        """Отправить уведомления в dead letter (повторять бессмысленно)"""
+        if not errors:
+            return
+        table = ReminderOutbox.__table__
+        query = (
+            update(table)
+            .where(table.c.id == bindparam("outbox_id"))
+            .values(
+                status=OutboxStatus.DEAD,
+                attempts=table.c.attempts + 1,
+                last_error=bindparam("error"),
+                locked_until=None,
+            )
+        )
+        connection = await self.db.connection()
+        await connection.execute(
+            query,
+            [{"outbox_id": outbox_id, "error": error} for outbox_id, error in errors.items()],
+        )
+        await self.db.flush()
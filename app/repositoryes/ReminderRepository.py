@@ -1,14 +1,29 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time
 from typing import Optional, List
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import TIMESTAMP, Date, Row, Time, Update, case, extract, func, insert, literal, select, update
 
-from app.database.models.reminder import Reminder
+from app.database.models.reminder import Reminder, ReminderOutbox
+from app.database.models.users import User
 from app.repositoryes.template import TemplateRepository
+from app.utils.reminder_signals import schedule_changed
 
 log = logging.getLogger(__name__)
 
+# Время срабатывания по умолчанию (по времени пользователя)
+DEFAULT_FIRE_TIME = time(9, 0)
+
+# Колонки, которые нужны диспетчеру для отправки просроченных напоминаний
+DUE_COLUMNS = (
+    Reminder.id,
+    Reminder.user_id,
+    Reminder.text,
+    Reminder.interval_days,
+    Reminder.is_one_time,
+    Reminder.next_fire_at,
+)
+
 
 class ReminderRepository(TemplateRepository):
 
@@ -23,10 +38,88 @@ class ReminderRepository(TemplateRepository):
     async def get(self, reminder_id: int) -> Optional[Reminder]:
         return await self.db.get(Reminder, reminder_id)
 
-    async def get_due_reminders(self, now: datetime) -> List[Reminder]:
-        query = select(Reminder).where(
-            Reminder.next_fire_at <= now,
-            Reminder.is_active == True,
+    async def get_due_reminders(self, now: datetime, limit: Optional[int] = None) -> List[Row]:
+        """Просроченные активные напоминания (только колонки DUE_COLUMNS)"""
+        query = (
+            select(*DUE_COLUMNS)
+            .where(
+                Reminder.next_fire_at <= now,
+                Reminder.is_active == True,
+            )
+            .order_by(Reminder.next_fire_at)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def enqueue_due(
+        self,
+        now: datetime,
+        limit: int,
+        skip_before: Optional[datetime] = None,
+    ) -> List[Row]:
+        """Переложить пачку просроченных напоминаний в outbox.
+
+        Всё в одной транзакции (фиксирует вызывающий): строки блокируются
+        FOR UPDATE SKIP LOCKED (реплики бота получают непересекающиеся пачки), для каждой создаётся
+        запись reminder_outbox, однократные выключаются, повторяющиеся
+        переносятся на следующее срабатывание. Пропущенные за время простоя
+        срабатывания схлопываются в одно уведомление.
+
+        :param skip_before: Повторяющиеся напоминания, просроченные раньше этого
+            момента, только переносятся без уведомления (однократные отправляются всегда)
+        """
+        query = (
+            select(*DUE_COLUMNS)
+            .where(
+                Reminder.next_fire_at <= now,
+                Reminder.is_active == True,
+            )
+            .order_by(Reminder.next_fire_at)
+            .limit(limit)
+            .with_for_update(of=Reminder, skip_locked=True)
+        )
+        result = await self.db.execute(query)
+        due = result.all()
+        if not due:
+            return []
+
+        notify = [
+            r for r in due
+            if r.is_one_time or skip_before is None or r.next_fire_at >= skip_before
+        ]
+        if len(notify) < len(due):
+            log.info("Skipped %d stale reminders", len(due) - len(notify))
+
+        if notify:
+            await self.db.execute(
+                insert(ReminderOutbox),
+                [
+                    {
+                        "reminder_id": r.id, "user_id": r.user_id, "text": r.text,
+                        "next_attempt_at": now, "fire_at": r.next_fire_at,
+                    }
+                    for r in notify
+                ],
+            )
+
+        one_time_ids = [r.id for r in due if r.is_one_time]
+        repeating_ids = [r.id for r in due if not r.is_one_time]
+        if one_time_ids:
+            await self.db.execute(_deactivate_query(one_time_ids))
+        if repeating_ids:
+            await self.db.execute(_advance_query(repeating_ids, now))
+
+        return due
+
+    async def get_upcoming_fire_times(self, limit: int = 100) -> List[datetime]:
+        """Ближайшие времена срабатывания активных напоминаний"""
+        query = (
+            select(Reminder.next_fire_at)
+            .where(Reminder.is_active == True)
+            .order_by(Reminder.next_fire_at)
+            .limit(limit)
         )
         result = await self.db.execute(query)
         return result.scalars().all()
@@ -37,22 +130,21 @@ class ReminderRepository(TemplateRepository):
         text: str,
         interval_days: int,
         is_one_time: bool = False,
+        fire_time: time = DEFAULT_FIRE_TIME,
     ) -> Reminder:
-        now = datetime.utcnow()
-        next_fire = (now + timedelta(days=interval_days)).replace(
-            hour=9, minute=0, second=0, microsecond=0
-        )
-
         reminder = Reminder(
             user_id=user_id,
             text=text,
             interval_days=interval_days,
             is_one_time=is_one_time,
-            next_fire_at=next_fire,
+            fire_time=fire_time,
+            next_fire_at=await self._first_fire_at(user_id, interval_days, fire_time),
         )
         self.db.add(reminder)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(reminder)
+        next_fire_at = reminder.next_fire_at
+        self.on_commit(lambda: schedule_changed(next_fire_at))
         return reminder
 
     async def update(
@@ -60,6 +152,7 @@ class ReminderRepository(TemplateRepository):
         reminder_id: int,
         text: Optional[str] = None,
         interval_days: Optional[int] = None,
+        fire_time: Optional[time] = None,
     ) -> Optional[Reminder]:
         reminder = await self.get(reminder_id)
         if not reminder:
@@ -69,44 +162,159 @@ class ReminderRepository(TemplateRepository):
             reminder.text = text
         if interval_days is not None:
             reminder.interval_days = interval_days
-            reminder.next_fire_at = (
-                datetime.utcnow() + timedelta(days=interval_days)
-            ).replace(hour=9, minute=0, second=0, microsecond=0)
+        if fire_time is not None:
+            reminder.fire_time = fire_time
 
-        await self.db.commit()
+        reschedule = interval_days is not None or fire_time is not None
+        if interval_days is not None:
+            reminder.next_fire_at = await self._first_fire_at(
+                reminder.user_id, reminder.interval_days, reminder.fire_time
+            )
+
+        await self.db.flush()
+        if reschedule and interval_days is None:
+            # Меняется только время: дата ближайшего срабатывания остаётся прежней
+            await self.db.execute(
+                _reschedule_query(Reminder.id == reminder_id, datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
         await self.db.refresh(reminder)
+        if reschedule:
+            next_fire_at = reminder.next_fire_at
+            self.on_commit(lambda: schedule_changed(next_fire_at))
         return reminder
 
+    async def _first_fire_at(self, user_id: int, interval_days: int, fire_time: time) -> datetime:
+        """Первое срабатывание: через interval_days дней в fire_time по времени пользователя (в UTC)"""
+        local_today = func.date(_to_local(literal(datetime.utcnow(), TIMESTAMP)), type_=Date)
+        local_fire = local_today + interval_days + literal(fire_time, Time)
+        query = select(_to_utc(local_fire)).where(User.id == user_id)
+        result = await self.db.execute(query)
+        return result.scalar_one()
+
+    async def reschedule_for_timezone(self, user_id: int, timezone: str) -> None:
+        """Пересчитать активные напоминания пользователя под новый часовой пояс.
+
+        Вызывать до смены users.timezone: дата ближайшего срабатывания берётся
+        в старом поясе, fire_time привязывается к новому.
+        """
+        result = await self.db.execute(
+            _reschedule_query(
+                (Reminder.user_id == user_id) & (Reminder.is_active == True),
+                datetime.utcnow(),
+                timezone=literal(timezone),
+            )
+            .returning(Reminder.next_fire_at)
+            .execution_options(synchronize_session=False)
+        )
+        fire_times = result.scalars().all()
+        if fire_times:
+            next_fire_at = min(fire_times)
+            self.on_commit(lambda: schedule_changed(next_fire_at))
+
     async def delete(self, reminder_id: int) -> bool:
         reminder = await self.get(reminder_id)
         if not reminder:
             return False
         await self.db.delete(reminder)
-        await self.db.commit()
+        await self.db.flush()
+        self.on_commit(schedule_changed)
         return True
 
     async def deactivate(self, reminder_id: int) -> bool:
-        reminder = await self.get(reminder_id)
-        if not reminder:
-            return False
-        reminder.is_active = False
-        await self.db.commit()
-        return True
+        return bool(await self.deactivate_many([reminder_id]))
 
     async def advance_next_fire(self, reminder_id: int) -> Optional[Reminder]:
-        reminder = await self.get(reminder_id)
-        if not reminder:
-            return None
+        advanced = await self.advance_many([reminder_id])
+        return advanced[0] if advanced else None
 
-        now = datetime.utcnow()
-        next_fire = reminder.next_fire_at
+    async def deactivate_many(self, reminder_ids: List[int]) -> List[Reminder]:
+        """Выключить несколько напоминаний одним UPDATE"""
+        if not reminder_ids:
+            return []
+        query = (
+            _deactivate_query(reminder_ids)
+            .returning(Reminder)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        reminders = result.scalars().all()
+        await self.db.flush()
+        return reminders
 
-        while next_fire <= now:
-            next_fire += timedelta(days=reminder.interval_days)
+    async def deactivate_for_users(self, user_ids: List[int]) -> int:
+        """Выключить все напоминания пользователей (например, заблокировавших бота)"""
+        if not user_ids:
+            return 0
+        result = await self.db.execute(
+            update(Reminder)
+            .where(Reminder.user_id.in_(user_ids), Reminder.is_active == True)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
+        if result.rowcount:
+            self.on_commit(schedule_changed)
+        return result.rowcount
 
-        next_fire = next_fire.replace(hour=9, minute=0, second=0, microsecond=0)
-        reminder.next_fire_at = next_fire
+    async def advance_many(self, reminder_ids: List[int], now: Optional[datetime] = None) -> List[Reminder]:
+        """Перенести несколько напоминаний на следующее срабатывание одним UPDATE"""
+        if not reminder_ids:
+            return []
+        query = (
+            _advance_query(reminder_ids, now or datetime.utcnow())
+            .returning(Reminder)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        reminders = result.scalars().all()
+        await self.db.flush()
+        return reminders
 
-        await self.db.commit()
-        await self.db.refresh(reminder)
-        return reminder
+
+def _deactivate_query(reminder_ids: List[int]) -> Update:
+    return (
+        update(Reminder)
+        .where(Reminder.id.in_(reminder_ids))
+        .values(is_active=False)
+    )
+
+
+def _to_local(utc_timestamp, timezone=User.timezone):
+    """UTC (naive) -> локальное время пользователя (naive), считается в Postgres"""
+    return func.timezone(timezone, func.timezone("UTC", utc_timestamp))
+
+
+def _to_utc(local_timestamp, timezone=User.timezone):
+    """Локальное время пользователя (naive) -> UTC (naive), считается в Postgres"""
+    return func.timezone("UTC", func.timezone(timezone, local_timestamp))
+
+
+def _advance_query(reminder_ids: List[int], now: datetime) -> Update:
+    """UPDATE переноса на следующее срабатывание"""
+    return _reschedule_query(Reminder.id.in_(reminder_ids), now)
+
+
+def _reschedule_query(condition, now: datetime, timezone=User.timezone) -> Update:
+    """UPDATE next_fire_at на ближайшее срабатывание позже now.
+
+    Всё считается в Postgres в локальном времени пользователя, без цикла по дням:
+    anchor = дата текущего next_fire_at + fire_time,
+    next = anchor + interval_days * max(floor((now - anchor) / interval) + 1, 0),
+    то есть anchor, если он ещё впереди, иначе следующее срабатывание после now.
+    Дата берётся в текущем поясе пользователя, а anchor отсчитывается в timezone
+    (отличается при смене пояса).
+
+    Однократное напоминание при сдвиге переносится на следующий день, а не на
+    interval_days: для него интервал - только отсрочка первого срабатывания.
+    """
+    period = case((Reminder.is_one_time == True, 1), else_=Reminder.interval_days)
+    anchor = func.date(_to_local(Reminder.next_fire_at), type_=Date) + Reminder.fire_time
+    elapsed = extract("epoch", _to_local(literal(now, TIMESTAMP), timezone) - anchor)
+    steps = func.greatest(func.floor(elapsed / (period * 86400)) + 1, 0)
+    next_local = anchor + func.make_interval(0, 0, 0, period) * steps
+    return (
+        update(Reminder)
+        .where(condition, Reminder.user_id == User.id)
+        .values(next_fire_at=_to_utc(next_local, timezone))
+    )
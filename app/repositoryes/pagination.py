@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Позиция пагинации: страница после/перед элементом с данным id (keyset)
+    или номер страницы в заранее сохранённом списке результатов.
+
+    Кодируется в короткую строку для callback_data: "0" - первая страница,
+    "a<id>" - после элемента, "b<id>" - перед элементом, "p<n>" - страница n.
+    """
+    after: Optional[int] = None
+    before: Optional[int] = None
+    page: Optional[int] = None
+
+    def encode(self) -> str:
+        if self.page is not None:
+            return f"p{self.page}"
+        if self.after is not None:
+            return f"a{self.after}"
+        if self.before is not None:
+            return f"b{self.before}"
+        return "0"
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        if token.startswith("a"):
+            return cls(after=int(token[1:]))
+        if token.startswith("b"):
+            return cls(before=int(token[1:]))
+        if token.startswith("p"):
+            return cls(page=int(token[1:]))
+        # "0" и номера страниц из старых сообщений - первая страница
+        int(token)
+        return cls()
+
+    @property
+    def is_first(self) -> bool:
+        return self.after is None and self.before is None and not self.page
+
+
+FIRST_PAGE = Cursor()
+
+
+@dataclass
+class Page(Generic[T]):
+    """Страница списка (keyset или по номеру страницы).
+
+    cursor - курсор, по которому получена страница (чтобы вернуться к ней),
+    total - общее количество, если его запрашивали.
+    """
+    items: List[T]
+    cursor: Cursor
+    has_next: bool
+    has_prev: bool
+    total: Optional[int] = None
+
+    @property
+    def next_cursor(self) -> Cursor:
+        if self.cursor.page is not None:
+            return Cursor(page=self.cursor.page + 1)
+        return Cursor(after=self.items[-1].id)
+
+    @property
+    def prev_cursor(self) -> Cursor:
+        if self.cursor.page is not None:
+            return Cursor(page=self.cursor.page - 1)
+        return Cursor(before=self.items[0].id)
@@ -1,5 +1,38 @@
+from typing import Callable
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Ключ session.info со списком действий после коммита
+_AFTER_COMMIT = "after_commit_callbacks"
+
 
 class TemplateRepository:
+    """Базовый репозиторий.
+
+    Репозитории не коммитят: изменения только flush-атся в транзакцию сессии,
+    а фиксирует её владелец сессии - DbSessionMiddleware (один коммит на
+    апдейт) или фоновый воркер, открывший сессию сам.
+    """
+
     def __init__(self, db: AsyncSession):
-        self.db = db
\ No newline at end of file
+        self.db = db
+
+    def on_commit(self, callback: Callable[[], None]):
+        """Выполнить callback после фиксации транзакции (при откате - не выполнять).
+
+        Для побочных эффектов вне БД: сигналы планировщику, процессные индексы и кэши.
+        """
+        self.db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session):
+    session.info.pop(_AFTER_COMMIT, None)
@@ -2,10 +2,11 @@ import uuid
 from typing import Optional
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, text, update
 
 from uuid import UUID
 from app.database.models.users import User
+from app.repositoryes.ReminderRepository import ReminderRepository
 from app.repositoryes.template import TemplateRepository
 
 log = logging.getLogger(__name__)
@@ -22,12 +23,27 @@ class UserRepository(TemplateRepository):
     async def create(self,telegram_id, username: Optional[str] = None) -> User:
         new_user = User(id=telegram_id, username=username)
         self.db.add(new_user)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(new_user)
 
         return new_user
 
+    async def set_timezone(self, user_id: int, timezone: str) -> bool:
+        """Установить часовой пояс (проверяется по pg_timezone_names)"""
+        exists = await self.db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_timezone_names WHERE name = :name)"),
+            {"name": timezone},
+        )
+        if not exists.scalar():
+            return False
+
+        # Ближайшие срабатывания сдвигаются вместе с поясом (в той же транзакции)
+        await ReminderRepository(self.db).reschedule_for_timezone(user_id, timezone)
+        await self.db.execute(update(User).where(User.id == user_id).values(timezone=timezone))
+        await self.db.flush()
+        return True
+
     async def delete(self, user_id: int) -> bool:
         await self.db.delete(await self.get(user_id))
-        await self.db.commit()
+        await self.db.flush()
         return True
\ No newline at end of file
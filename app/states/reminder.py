@@ -4,6 +4,7 @@ from aiogram.fsm.state import State, StatesGroup
 class ReminderCreateStates(StatesGroup):
     entering_text = State()
     entering_interval = State()
+    entering_time = State()
     choosing_type = State()
 
 
@@ -11,3 +12,4 @@ class ReminderEditStates(StatesGroup):
     choosing_field = State()
     entering_text = State()
     entering_interval = State()
+    entering_time = State()
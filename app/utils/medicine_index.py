@@ -0,0 +1,198 @@
+import asyncio
+import enum
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from app.database.models.medicine import MedicineType, MedicineCategory
+from app.utils.medicine_names import normalize_medicine_name
+
+
+@dataclass(frozen=True)
+class MedicineEntry:
+    """Лёгкая запись справочника для поиска похожих (без ORM)"""
+    id: int
+    name: str
+    dosage: Optional[str]
+    medicine_type: MedicineType
+    category: MedicineCategory
+
+
+class BulkMatchStatus(enum.Enum):
+    LINK = "link"  # уверенное совпадение - привязать к существующему лекарству
+    FLAG = "flag"  # похоже, но нужна проверка человеком
+    NEW = "new"    # похожих нет - новое лекарство
+
+
+@dataclass(frozen=True)
+class BulkMatch:
+    """Результат сопоставления одной строки массовой загрузки"""
+    name: str
+    status: BulkMatchStatus
+    match: Optional[MedicineEntry]
+    score: float
+
+
+# Сколько входных названий сравнивается за один вызов cdist:
+# матрица chunk x размер справочника (uint8) держится в памяти целиком
+BULK_CHUNK_SIZE = 1000
+
+
+class MedicineNameIndex:
+    """Процессный индекс верифицированных лекарств для нечёткого поиска.
+
+    Строится один раз из БД, дальше обновляется точечно (upsert/remove) при
+    верификации/отклонении и создании лекарств. Названия хранятся уже
+    нормализованными (normalize_medicine_name), поэтому при поиске
+    обрабатывается только сам запрос. Раз в refresh_interval секунд индекс
+    перечитывается целиком - на случай изменений из других процессов.
+
+    Usage:
+        await medicine_index.ensure_loaded(medicine_repo.get_verified_entries)
+        similar = medicine_index.search("нурофен", limit=3, score_cutoff=60)
+    """
+
+    def __init__(self, refresh_interval: float = 600):
+        self.refresh_interval = refresh_interval
+        self._entries: dict[int, MedicineEntry] = {}
+        self._processed: dict[int, str] = {}
+        # Параллельные списки для process.extract, пересобираются после изменений
+        self._ids: List[int] = []
+        self._names: List[str] = []
+        self._dirty = False
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self, loader: Callable[[], Awaitable[Iterable[MedicineEntry]]]):
+        """Загрузить индекс, если он ещё не построен или устарел"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            self.rebuild(await loader())
+
+    def rebuild(self, entries: Iterable[MedicineEntry]):
+        self._entries = {}
+        self._processed = {}
+        for entry in entries:
+            self._put(entry)
+        self._dirty = True
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Перечитать индекс при следующем обращении"""
+        self._loaded_at = None
+
+    def upsert(self, entry: MedicineEntry):
+        if self._loaded_at is None:
+            return
+        self._put(entry)
+        self._dirty = True
+
+    def remove(self, medicine_id: int):
+        if self._entries.pop(medicine_id, None) is not None:
+            self._processed.pop(medicine_id, None)
+            self._dirty = True
+
+    def search(self, query: str, limit: int = 3, score_cutoff: float = 0) -> List[tuple[MedicineEntry, float]]:
+        """Найти похожие названия: список (MedicineEntry, score)"""
+        self._refresh_lists()
+        if not self._names:
+            return []
+
+        results = process.extract(
+            normalize_medicine_name(query),
+            self._names,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=limit,
+            score_cutoff=score_cutoff,
+        )
+        return [(self._entries[self._ids[idx]], score) for _, score, idx in results]
+
+    def match_many(
+        self,
+        names: Sequence[str],
+        link_cutoff: float = 90,
+        flag_cutoff: float = 60,
+    ) -> List[BulkMatch]:
+        """Сопоставить пачку названий со справочником (массовая загрузка).
+
+        Одинаковые после нормализации названия считаются один раз, остальные
+        сравниваются со всем справочником одним process.cdist на все ядра
+        (workers=-1), порциями по BULK_CHUNK_SIZE. Для каждой строки берётся
+        лучшее совпадение: >= link_cutoff - LINK, >= flag_cutoff - FLAG, иначе NEW.
+
+        Считается синхронно и долго - из обработчиков вызывать через bulk_match.
+        """
+        # Снимок индекса: пока идёт подсчёт в потоке, upsert/remove меняют словари
+        self._refresh_lists()
+        ids, names_index, entries = self._ids, self._names, dict(self._entries)
+        keys = [normalize_medicine_name(name) for name in names]
+        unique_keys = list(dict.fromkeys(keys))
+
+        best: dict[str, tuple[Optional[MedicineEntry], float]] = {}
+        for start in range(0, len(unique_keys) if names_index else 0, BULK_CHUNK_SIZE):
+            chunk = unique_keys[start:start + BULK_CHUNK_SIZE]
+            scores = process.cdist(
+                chunk,
+                names_index,
+                scorer=fuzz.WRatio,
+                processor=None,
+                score_cutoff=flag_cutoff,
+                dtype=np.uint8,
+                workers=-1,
+            )
+            columns = scores.argmax(axis=1)
+            for key, column, row in zip(chunk, columns, scores):
+                score = float(row[column])
+                entry = entries.get(ids[column])
+                if score and entry is not None:
+                    best[key] = (entry, score)
+
+        matches = []
+        for name, key in zip(names, keys):
+            entry, score = best.get(key, (None, 0.0))
+            if entry is not None and score >= link_cutoff:
+                status = BulkMatchStatus.LINK
+            elif entry is not None:
+                status = BulkMatchStatus.FLAG
+            else:
+                status = BulkMatchStatus.NEW
+            matches.append(BulkMatch(name=name, status=status, match=entry, score=score))
+        return matches
+
+    def _refresh_lists(self):
+        if self._dirty:
+            self._ids = list(self._processed)
+            self._names = list(self._processed.values())
+            self._dirty = False
+
+    def _put(self, entry: MedicineEntry):
+        self._entries[entry.id] = entry
+        self._processed[entry.id] = normalize_medicine_name(entry.name)
+
+
+medicine_index = MedicineNameIndex()
+
+
+async def bulk_match(
+    names: Sequence[str],
+    loader: Callable[[], Awaitable[Iterable[MedicineEntry]]],
+    link_cutoff: float = 90,
+    flag_cutoff: float = 60,
+) -> List[BulkMatch]:
+    """Дедупликация массовой загрузки по справочнику, не блокируя event loop.
+
+    Вызывается админской командой /dedup; индекс загружается при первом вызове
+    и дальше обновляется точечно из MedicineRepository.
+
+    Usage:
+        matches = await bulk_match(names, medicine_repo.get_verified_entries)
+    """
+    await medicine_index.ensure_loaded(loader)
+    return await asyncio.to_thread(medicine_index.match_many, names, link_cutoff, flag_cutoff)
@@ -0,0 +1,28 @@
+import re
+
+# Дозировка внутри названия: "200мг", "2,5 мл", "5%", просто "400"
+_DOSAGE_RE = re.compile(r"\b\d+(?:[.,]\d+)?\s*(?:мкг|mcg|мг|mg|мл|ml|ме|iu|ед|г|g|%)?(?!\w)")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f",
+    "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+
+def normalize_medicine_name(name: str, transliterate: bool = True) -> str:
+    """Ключ поиска по названию лекарства.
+
+    Нижний регистр, ё -> е, без дозировки и пунктуации, пробелы схлопнуты.
+    С transliterate=True кириллица переводится в латиницу, чтобы
+    "Нурофен 200мг" и "Nurofen" давали один ключ "nurofen".
+    """
+    key = name.lower().replace("ё", "е")
+    key = _DOSAGE_RE.sub(" ", key)
+    key = _NON_WORD_RE.sub(" ", key)
+    if transliterate:
+        key = key.translate(_TRANSLIT)
+    return " ".join(key.split())
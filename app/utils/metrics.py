@@ -1,5 +1,64 @@
-from prometheus_client import start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+
+# Метрики пайплайна напоминаний
+reminder_fire_lag = Histogram(
+    "bot_reminder_fire_lag_seconds",
+    "Delay between next_fire_at and the moment the reminder was enqueued",
+    buckets=(1, 5, 15, 30, 60, 300, 900, 3600, 6 * 3600, 24 * 3600),
+)
+
+reminder_delivery_lag = Histogram(
+    "bot_reminder_delivery_lag_seconds",
+    "Delay between next_fire_at and successful delivery of the notification",
+    buckets=(1, 5, 15, 30, 60, 300, 900, 3600, 6 * 3600, 24 * 3600),
+)
+
+reminder_due_batch_size = Histogram(
+    "bot_reminder_due_batch_size",
+    "Due reminders enqueued per batch",
+    buckets=(1, 5, 10, 50, 100, 250, 500, 1000, 5000),
+)
+
+reminder_tick_duration = Histogram(
+    "bot_reminder_tick_duration_seconds",
+    "Dispatcher tick duration (moving due reminders to the outbox)"
+)
+
+reminder_send_latency = Histogram(
+    "bot_reminder_send_latency_seconds",
+    "Telegram send_message latency for reminder notifications"
+)
+
+reminder_messages_sent = Counter(
+    "bot_reminder_messages_sent_total",
+    "Reminder notifications delivered"
+)
+
+reminder_send_failures = Counter(
+    "bot_reminder_send_failures_total",
+    "Reminder notification send failures",
+    ["exception"]
+)
+
+reminder_send_retry_after = Counter(
+    "bot_reminder_send_retry_after_total",
+    "Telegram flood-control responses (RetryAfter) before a repeated send"
+)
+
+reminder_outbox_batch_size = Gauge(
+    "bot_reminder_outbox_last_batch_size",
+    "Size of the last outbox batch claimed by the worker"
+)
+
+# Кэш похожих лекарств в форме загрузки
+similar_cache_lookups = Counter(
+    "bot_similar_cache_lookups_total",
+    "Similar medicine lookups by cache level that served them",
+    ["result"]
+)
+
 
 def metrics_run():
     # порт, на котором Prometheus будет забирать метрики
-    start_http_server(8000)
\ No newline at end of file
+    start_http_server(8000)
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from redis.asyncio import Redis
+
+from app.core.config import ReminderConfig
+from app.database.models.reminder import ReminderOutbox
+from app.database.psql import AsyncSessionLocal
+from app.repositoryes.ReminderOutboxRepository import ReminderOutboxRepository
+from app.repositoryes.ReminderRepository import ReminderRepository
+from app.lexicon.lexicon_reminder import REMINDER_LEXICON_RU as L
+from app.utils.metrics import (
+    reminder_delivery_lag,
+    reminder_messages_sent,
+    reminder_outbox_batch_size,
+    reminder_send_failures,
+    reminder_send_latency,
+    reminder_send_retry_after,
+)
+from app.utils.rate_limit import RateLimiter, RedisRateLimiter
+
+log = logging.getLogger(__name__)
+
+# Минимальная пауза между проверками очереди, секунды
+MIN_SLEEP = 5
+# Пауза после ошибки воркера, секунды
+RETRY_DELAY = 60
+# Как часто удалять старые DEAD-уведомления, секунды
+PURGE_INTERVAL = 3600
+
+# Лимит длины сообщения Telegram
+MAX_MESSAGE_LENGTH = 4096
+
+# Ошибки, после которых повторять отправку бессмысленно (бот заблокирован, чата нет)
+DEAD_ERRORS = (TelegramForbiddenError, TelegramBadRequest)
+# Пользователь заблокировал бота или удалил аккаунт - его напоминания выключаются,
+# иначе повторяющиеся копили бы DEAD-записи каждый интервал
+BLOCKED_ERRORS = (TelegramForbiddenError,)
+
+
+def _render(messages: List[ReminderOutbox]) -> str:
+    """Текст уведомления: несколько напоминаний пользователя - одним сообщением"""
+    if len(messages) == 1:
+        return L["notification"].format(text=messages[0].text)
+    items = "".join(L["notification_item"].format(text=m.text) for m in messages)
+    return L["notification_many"].format(count=len(messages), items=items)[:MAX_MESSAGE_LENGTH]
+
+
+async def _send(
+    bot: Bot,
+    limiter: RateLimiter,
+    user_id: int,
+    messages: List[ReminderOutbox],
+) -> Optional[Exception]:
+    """Отправить пользователю его уведомления с учётом лимитов Telegram, вернуть ошибку"""
+    await limiter.acquire(user_id)
+    text = _render(messages)
+    try:
+        try:
+            with reminder_send_latency.time():
+                await bot.send_message(chat_id=user_id, text=text)
+        except TelegramRetryAfter as e:
+            # Telegram просит подождать - ждём и пробуем ещё раз. В failures
+            # попадает только итоговая ошибка, если не удалась и повторная отправка
+            reminder_send_retry_after.inc()
+            await asyncio.sleep(e.retry_after)
+            with reminder_send_latency.time():
+                await bot.send_message(chat_id=user_id, text=text)
+    except Exception as e:
+        reminder_send_failures.labels(exception=type(e).__name__).inc()
+        log.warning(
+            "Failed to send reminders %s to %s: %s",
+            [m.reminder_id for m in messages], user_id, e,
+        )
+        return e
+    reminder_messages_sent.inc()
+    # Задержка глазами пользователя: от планового срабатывания до доставки,
+    # включая очередь, повторы и ожидание лимитов
+    sent_at = datetime.utcnow()
+    for message in messages:
+        if message.fire_at is not None:
+            reminder_delivery_lag.observe((sent_at - message.fire_at).total_seconds())
+    return None
+
+
+async def _deliver_batch(
+    bot: Bot,
+    messages: List[ReminderOutbox],
+    limiter: RateLimiter,
+    concurrency: int,
+) -> dict[int, Optional[Exception]]:
+    """Параллельно отправить пачку уведомлений, вернуть ошибку по id каждого.
+
+    Уведомления одного пользователя склеиваются в одно сообщение.
+    """
+    by_user: dict[int, List[ReminderOutbox]] = {}
+    for message in messages:
+        by_user.setdefault(message.user_id, []).append(message)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver(user_id: int, user_messages: List[ReminderOutbox]) -> Optional[Exception]:
+        async with semaphore:
+            return await _send(bot, limiter, user_id, user_messages)
+
+    results = await asyncio.gather(*(deliver(u, m) for u, m in by_user.items()))
+
+    errors = {}
+    for user_messages, error in zip(by_user.values(), results):
+        for message in user_messages:
+            errors[message.id] = error
+    return errors
+
+
+class OutboxWorker:
+    """Воркер доставки уведомлений из reminder_outbox.
+
+    Забирает пачки в аренду, отправляет их параллельно, доставленные удаляет,
+    неудачные планирует на повтор с экспоненциальной задержкой, а для
+    заблокировавших бота пользователей сразу переводит в DEAD и выключает их
+    напоминания. DEAD-записи старше dead_retention_days удаляются.
+
+    С redis лимиты отправки общие для всех реплик бота, без него - на процесс.
+    """
+
+    def __init__(self, bot: Bot, max_sleep: float, config: ReminderConfig, redis: Optional[Redis] = None):
+        self.bot = bot
+        self.max_sleep = max_sleep
+        self.config = config
+        if redis is not None:
+            self.limiter = RedisRateLimiter(redis, config.rate_limit, config.chat_rate_limit)
+        else:
+            self.limiter = RateLimiter(config.rate_limit, config.chat_rate_limit)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._purged_at: Optional[float] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """В очереди появились новые уведомления"""
+        self._wakeup.set()
+
+    async def _drain(self):
+        config = self.config
+        async with AsyncSessionLocal() as session:
+            repo = ReminderOutboxRepository(session)
+
+            while True:
+                now = datetime.utcnow()
+                batch = await repo.claim(now, config.batch_size, config.lease_seconds)
+                # Аренда фиксируется до отправки, чтобы не держать транзакцию на время запросов к Telegram
+                await session.commit()
+                reminder_outbox_batch_size.set(len(batch))
+                if not batch:
+                    break
+
+                errors = await _deliver_batch(self.bot, batch, self.limiter, config.send_concurrency)
+
+                sent, failed, dead = [], {}, {}
+                for outbox_id, error in errors.items():
+                    if error is None:
+                        sent.append(outbox_id)
+                    elif isinstance(error, DEAD_ERRORS):
+                        dead[outbox_id] = str(error)
+                    else:
+                        failed[outbox_id] = str(error)
+                blocked = {m.user_id for m in batch if isinstance(errors[m.id], BLOCKED_ERRORS)}
+
+                await repo.mark_sent(sent)
+                await repo.mark_failed(
+                    failed, now,
+                    max_attempts=config.max_attempts,
+                    backoff_base=config.backoff_base,
+                    backoff_max=config.backoff_max,
+                )
+                await repo.mark_dead(dead)
+                if blocked:
+                    deactivated = await ReminderRepository(session).deactivate_for_users(list(blocked))
+                    log.info("Deactivated %d reminders of %d users who blocked the bot", deactivated, len(blocked))
+                await session.commit()
+
+                if len(batch) < config.batch_size:
+                    break
+
+    async def _purge_dead(self):
+        """Раз в PURGE_INTERVAL удалить старые DEAD-уведомления"""
+        now = asyncio.get_running_loop().time()
+        if self._purged_at is not None and now - self._purged_at < PURGE_INTERVAL:
+            return
+        async with AsyncSessionLocal() as session:
+            purged = await ReminderOutboxRepository(session).purge_dead(self.config.dead_retention_days)
+            await session.commit()
+        self._purged_at = now
+        if purged:
+            log.info("Purged %d dead reminder notifications", purged)
+
+    async def _seconds_until_next(self) -> float:
+        async with AsyncSessionLocal() as session:
+            next_attempt_at = await ReminderOutboxRepository(session).get_next_attempt_at()
+        if next_attempt_at is None:
+            return self.max_sleep
+        delay = (next_attempt_at - datetime.utcnow()).total_seconds()
+        return max(MIN_SLEEP, min(delay, self.max_sleep))
+
+    async def _run(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                await self._drain()
+                await self._purge_dead()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=await self._seconds_until_next())
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Reminder outbox worker error: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+log = logging.getLogger(__name__)
+
+# Резервирование слота в Redis: та же логика, что в RateLimiter.acquire,
+# но атомарно и с общим для всех реплик состоянием. Время берётся у Redis,
+# чтобы не зависеть от расхождения часов между машинами. Всё в микросекундах.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local chat_interval = tonumber(ARGV[2])
+local slot = math.max(now, tonumber(redis.call('GET', KEYS[1]) or 0), tonumber(redis.call('GET', KEYS[2]) or 0))
+redis.call('SET', KEYS[1], slot + interval, 'PX', math.ceil((slot + interval - now) / 1000) + 1)
+redis.call('SET', KEYS[2], slot + chat_interval, 'PX', math.ceil((slot + chat_interval - now) / 1000) + 1)
+return slot - now
+"""
+
+
+class RateLimiter:
+    """Ограничитель частоты отправки сообщений в Telegram.
+
+    Равномерно распределяет отправки так, чтобы соблюдались оба лимита:
+    общий (rate сообщений в секунду на бота) и на один чат
+    (chat_rate сообщений в секунду).
+
+    Состояние хранится в памяти процесса, поэтому лимит действует на один
+    процесс. Для нескольких реплик бота - RedisRateLimiter.
+
+    Usage:
+        limiter = RateLimiter(rate=25, chat_rate=1)
+        await limiter.acquire(chat_id)
+        await bot.send_message(chat_id, ...)
+    """
+
+    # После скольких чатов чистим устаревшие записи
+    _CLEANUP_THRESHOLD = 10_000
+
+    def __init__(self, rate: float, chat_rate: float):
+        self.interval = 1.0 / rate
+        self.chat_interval = 1.0 / chat_rate
+        self._next_at = 0.0
+        self._chat_next_at: dict[int, float] = {}
+
+    async def acquire(self, chat_id: int):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        # Слот отправки: не раньше общего и не раньше слота чата
+        slot = max(now, self._next_at, self._chat_next_at.get(chat_id, 0.0))
+        self._next_at = slot + self.interval
+        self._chat_next_at[chat_id] = slot + self.chat_interval
+
+        if len(self._chat_next_at) > self._CLEANUP_THRESHOLD:
+            self._cleanup(now)
+
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _cleanup(self, now: float):
+        self._chat_next_at = {
+            chat_id: next_at
+            for chat_id, next_at in self._chat_next_at.items()
+            if next_at > now
+        }
+
+
+class RedisRateLimiter(RateLimiter):
+    """RateLimiter с общими для всех реплик бота слотами в Redis.
+
+    rate - лимит на бота целиком, сколько бы процессов ни отправляло
+    сообщения. Ключи чатов живут, пока слот не прошёл, и удаляются сами.
+    Если Redis недоступен, слот выдаётся локально (лимит снова действует
+    на процесс) - отправка уведомлений не останавливается.
+    """
+
+    def __init__(self, redis: Redis, rate: float, chat_rate: float, prefix: str = "rate_limit:reminders"):
+        super().__init__(rate, chat_rate)
+        self.prefix = prefix
+        self._reserve = redis.register_script(_RESERVE_SCRIPT)
+
+    async def acquire(self, chat_id: int):
+        try:
+            delay_us = await self._reserve(
+                keys=[f"{self.prefix}:global", f"{self.prefix}:chat:{chat_id}"],
+                args=[round(self.interval * 1_000_000), round(self.chat_interval * 1_000_000)],
+            )
+        except RedisError as e:
+            log.warning("Shared rate limit is unavailable, using the local one: %s", e)
+            await super().acquire(chat_id)
+            return
+
+        if delay_us > 0:
+            await asyncio.sleep(delay_us / 1_000_000)
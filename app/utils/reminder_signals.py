@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Callable, Optional
+
+# Слушатели изменений расписания напоминаний (диспетчер в app/utils/scheduler.py)
+_listeners: list[Callable[[Optional[datetime]], None]] = []
+
+
+def subscribe(listener: Callable[[Optional[datetime]], None]):
+    """Подписаться на изменения расписания напоминаний"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[Optional[datetime]], None]):
+    """Отписаться от изменений расписания напоминаний"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def schedule_changed(fire_at: Optional[datetime] = None):
+    """Сообщить слушателям, что расписание изменилось.
+
+    :param fire_at: Новое время срабатывания (None - напоминание удалено/выключено)
+    """
+    for listener in list(_listeners):
+        listener(fire_at)
@@ -1,55 +1,181 @@
+import asyncio
+import heapq
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 from aiogram import Bot
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from redis.asyncio import Redis
 
-from app.core.config import load_config
+from app.core.config import ReminderConfig, load_config
 from app.database.psql import AsyncSessionLocal
 from app.repositoryes.ReminderRepository import ReminderRepository
-from app.lexicon.lexicon_reminder import REMINDER_LEXICON_RU as L
+from app.utils import reminder_signals
+from app.utils.metrics import reminder_due_batch_size, reminder_fire_lag, reminder_tick_duration
+from app.utils.outbox import OutboxWorker
 
 log = logging.getLogger(__name__)
 
-_scheduler: AsyncIOScheduler | None = None
+# Сколько ближайших времён срабатывания держим в памяти
+UPCOMING_PRELOAD = 100
+# Пауза после ошибки диспетчера и перед повторной проверкой, секунды
+RETRY_DELAY = 60
 
+_dispatcher: Optional["ReminderDispatcher"] = None
+_outbox: Optional[OutboxWorker] = None
 
-async def _check_reminders(bot: Bot):
+
+async def _enqueue_due(config: ReminderConfig) -> tuple[int, bool]:
+    """Переложить просроченные напоминания в outbox.
+
+    За одно срабатывание берётся не больше config.max_per_tick напоминаний,
+    чтобы после долгого простоя не залить outbox (и Telegram) разом.
+    Возвращает число обработанных и признак, что просроченные ещё остались.
+    """
     now = datetime.utcnow()
+    skip_before = None
+    if config.catchup_max_lag:
+        skip_before = now - timedelta(seconds=config.catchup_max_lag)
+
+    total = 0
+    has_more = False
     async with AsyncSessionLocal() as session:
         repo = ReminderRepository(session)
-        due = await repo.get_due_reminders(now)
 
-        for reminder in due:
+        while total < config.max_per_tick:
+            limit = min(config.batch_size, config.max_per_tick - total)
+            batch = await repo.enqueue_due(now, limit, skip_before=skip_before)
+            # Каждая пачка - своя транзакция: блокировки строк держатся недолго
+            await session.commit()
+            total += len(batch)
+
+            if batch:
+                reminder_due_batch_size.observe(len(batch))
+                enqueued_at = datetime.utcnow()
+                for reminder in batch:
+                    reminder_fire_lag.observe((enqueued_at - reminder.next_fire_at).total_seconds())
+            if len(batch) < limit:
+                break
+        else:
+            has_more = True
+
+    log.debug("Checked reminders: %d due", total)
+    return total, has_more
+
+
+class ReminderDispatcher:
+    """Диспетчер напоминаний.
+
+    Держит в памяти min-heap ближайших next_fire_at и спит ровно до
+    ближайшего из них. ReminderRepository будит диспетчер через
+    reminder_signals при создании/изменении/удалении напоминаний.
+    max_sleep - страховочный интервал перечитывания расписания из БД
+    (изменения, сделанные другими процессами).
+
+    Сработавшие напоминания только кладутся в outbox, отправкой занимается
+    OutboxWorker, поэтому медленная отправка не задерживает диспетчер.
+    """
+
+    def __init__(self, outbox: OutboxWorker, max_sleep: float, config: ReminderConfig):
+        self.outbox = outbox
+        self.max_sleep = max_sleep
+        self.config = config
+        self._heap: list[datetime] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        reminder_signals.subscribe(self.notify)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        reminder_signals.unsubscribe(self.notify)
+        if self._task:
+            self._task.cancel()
             try:
-                await bot.send_message(
-                    chat_id=reminder.user_id,
-                    text=L["notification"].format(text=reminder.text),
-                )
-            except Exception as e:
-                log.warning("Failed to send reminder %s to %s: %s", reminder.id, reminder.user_id, e)
-                continue
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self, fire_at: Optional[datetime] = None):
+        """Расписание изменилось - пересчитать время сна"""
+        if fire_at is not None:
+            heapq.heappush(self._heap, fire_at)
+        self._wakeup.set()
+
+    async def _reload(self, now: Optional[datetime] = None, retry_at: Optional[datetime] = None):
+        """Перечитать ближайшие времена срабатывания из БД.
+
+        Напоминания, оставшиеся просроченными на момент now после обработки
+        (заблокированы другой репликой, не влезли в max_per_tick), откладываются
+        до retry_at, чтобы не крутиться в цикле. Остальные не трогаются.
+        """
+        async with AsyncSessionLocal() as session:
+            fire_times = await ReminderRepository(session).get_upcoming_fire_times(UPCOMING_PRELOAD)
+
+        if now is not None and retry_at is not None:
+            fire_times = [retry_at if fire_at <= now else fire_at for fire_at in fire_times]
 
-            if reminder.is_one_time:
-                await repo.deactivate(reminder.id)
-            else:
-                await repo.advance_next_fire(reminder.id)
+        self._heap = list(fire_times)
+        heapq.heapify(self._heap)
 
-        log.debug("Checked reminders: %d due", len(due))
+    def _seconds_until_next(self) -> float:
+        if not self._heap:
+            return self.max_sleep
+        delay = (self._heap[0] - datetime.utcnow()).total_seconds()
+        return max(0.0, min(delay, self.max_sleep))
+
+    async def _run(self):
+        # Первая загрузка тоже повторяется: БД может быть недоступна при старте бота
+        loaded = False
+        while True:
+            try:
+                if not loaded:
+                    await self._reload()
+                    loaded = True
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next())
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+                now = datetime.utcnow()
+                if self._heap and self._heap[0] <= now:
+                    with reminder_tick_duration.time():
+                        total, has_more = await _enqueue_due(self.config)
+                    if total:
+                        self.outbox.wake()
+                    # Догоняем после простоя порциями, с паузой между ними
+                    pause = self.config.catchup_pause if has_more else RETRY_DELAY
+                    await self._reload(now, retry_at=now + timedelta(seconds=pause))
+                else:
+                    await self._reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Reminder dispatcher error: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
 
 
-def setup_scheduler(bot: Bot):
-    global _scheduler
+def setup_scheduler(bot: Bot, redis: Optional[Redis] = None):
+    global _dispatcher, _outbox
     config = load_config()
-    _scheduler = AsyncIOScheduler()
-    _scheduler.add_job(_check_reminders, "interval", seconds=config.scheduler_interval, args=[bot])
-    _scheduler.start()
+    _outbox = OutboxWorker(bot, max_sleep=config.scheduler_interval, config=config.reminders, redis=redis)
+    _outbox.start()
+    _dispatcher = ReminderDispatcher(_outbox, max_sleep=config.scheduler_interval, config=config.reminders)
+    _dispatcher.start()
     log.info("Scheduler started")
 
 
 async def shutdown_scheduler():
-    global _scheduler
-    if _scheduler:
-        _scheduler.shutdown(wait=False)
-        _scheduler = None
-        log.info("Scheduler stopped")
+    global _dispatcher, _outbox
+    if _dispatcher:
+        await _dispatcher.stop()
+        _dispatcher = None
+    if _outbox:
+        await _outbox.stop()
+        _outbox = None
+    log.info("Scheduler stopped")
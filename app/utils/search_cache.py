@@ -0,0 +1,72 @@
+import secrets
+from typing import List, Optional
+
+from redis.asyncio import Redis
+
+# Сколько живут результаты поиска, секунды
+SEARCH_TTL = 900
+# Сколько последних поисков пользователя хранится одновременно
+MAX_SEARCHES_PER_USER = 5
+# Сколько id результатов сохраняется на один поиск
+MAX_RESULT_IDS = 1000
+
+
+def _ids_key(user_id: int, token: str) -> str:
+    return f"search:{user_id}:{token}"
+
+
+def _meta_key(user_id: int, token: str) -> str:
+    return f"search:{user_id}:{token}:meta"
+
+
+async def save_search(redis: Redis, user_id: int, ids: List[int], kind: str, query: str) -> str:
+    """Сохранить упорядоченные id результатов поиска, вернуть короткий токен.
+
+    Токен уходит в callback_data вместо самого запроса. Ключи живут SEARCH_TTL
+    секунд, у пользователя хранится не больше MAX_SEARCHES_PER_USER поисков -
+    самые старые удаляются.
+    """
+    token = secrets.token_urlsafe(6)
+    ids_key = _ids_key(user_id, token)
+    meta_key = _meta_key(user_id, token)
+    index_key = f"search:{user_id}"
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.rpush(ids_key, *ids[:MAX_RESULT_IDS])
+        pipe.expire(ids_key, SEARCH_TTL)
+        pipe.hset(meta_key, mapping={"kind": kind, "query": query})
+        pipe.expire(meta_key, SEARCH_TTL)
+        pipe.lpush(index_key, token)
+        pipe.lrange(index_key, MAX_SEARCHES_PER_USER, -1)
+        pipe.ltrim(index_key, 0, MAX_SEARCHES_PER_USER - 1)
+        pipe.expire(index_key, SEARCH_TTL)
+        results = await pipe.execute()
+
+    evicted = results[5]
+    if evicted:
+        await redis.delete(*[key for t in evicted for key in (_ids_key(user_id, t), _meta_key(user_id, t))])
+    return token
+
+
+async def get_search_page(
+    redis: Redis,
+    user_id: int,
+    token: str,
+    page: int,
+    per_page: int,
+) -> Optional[tuple[List[int], int, dict]]:
+    """id результатов на странице, их общее количество и параметры поиска.
+
+    None - поиск не найден (истёк TTL или вытеснен более новыми).
+    """
+    ids_key = _ids_key(user_id, token)
+    start = page * per_page
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.lrange(ids_key, start, start + per_page - 1)
+        pipe.llen(ids_key)
+        pipe.hgetall(_meta_key(user_id, token))
+        ids, total, meta = await pipe.execute()
+
+    if not total or not meta:
+        return None
+    return [int(i) for i in ids], total, meta
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from redis.asyncio import Redis
+
+from app.utils.medicine_index import MedicineEntry
+from app.utils.metrics import similar_cache_lookups
+
+log = logging.getLogger(__name__)
+
+# Версия справочника верифицированных лекарств: растёт при каждом изменении
+VERSION_KEY = "similar:version"
+# Ключ на запрос: similar:result:limit:score_cutoff:ключ -> {"v": версия, "r": [[id, score], ...]}
+RESULT_KEY_PREFIX = "similar:result:"
+# Сколько живёт результат в Redis, секунды (у каждого запроса свой TTL)
+SIMILAR_TTL = 24 * 3600
+# Размер процессного LRU
+LOCAL_CACHE_SIZE = 1024
+# Сколько процесс верит прочитанной версии, секунды: столько же может жить
+# результат, устаревший из-за изменения справочника в другом процессе
+VERSION_TTL = 5
+
+Matches = List[tuple[MedicineEntry, float]]
+
+
+class SimilarCache:
+    """Кэш похожих лекарств для формы загрузки: нормализованный запрос -> top-k.
+
+    Два уровня: процессный LRU (готовые MedicineEntry) и ключи в Redis со своим
+    TTL (только id и score) - старые и редкие запросы вытесняются сами. Оба уровня
+    проверяются по версии справочника в Redis, поэтому изменение верифицированных
+    лекарств в любом процессе сбрасывает кэш везде. Версия запоминается на
+    VERSION_TTL секунд, так что попадание в LRU обходится без Redis; изменения
+    в своём процессе сбрасывают LRU сразу, в чужих - не позже чем через VERSION_TTL.
+
+    Репозиторий вызывает invalidate() синхронно после коммита - локальный LRU
+    очищается сразу, а версия в Redis поднимается фоновой задачей (нужен bind()
+    при старте). Если поднять не удалось, это повторится при следующем обращении.
+
+    Usage:
+        similar = await similar_cache.get_or_compute(
+            redis, key, limit, score_cutoff,
+            compute=lambda: medicine_repo.find_similar(name, limit, score_cutoff),
+            resolve=medicine_repo.get_entries,
+        )
+    """
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._local: OrderedDict[str, tuple[Optional[int], Matches]] = OrderedDict()
+        # Справочник изменился, а версия в Redis ещё не поднята
+        self._stale = False
+        self._redis: Optional[Redis] = None
+        self._tasks: set[asyncio.Task] = set()
+        # Последняя прочитанная из Redis версия и когда (loop.time())
+        self._version: Optional[int] = None
+        self._version_at = 0.0
+
+    def bind(self, redis: Redis):
+        """Redis для немедленного сброса версии в invalidate()"""
+        self._redis = redis
+
+    def invalidate(self):
+        """Справочник верифицированных лекарств изменился"""
+        self._local.clear()
+        self._stale = True
+        self._version = None
+        if self._redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._bump_version(self._redis))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _bump_version(self, redis: Redis):
+        # Несколько invalidate() подряд поднимают версию один раз
+        if not self._stale:
+            return
+        self._stale = False
+        try:
+            self._set_version(await redis.incr(VERSION_KEY))
+        except Exception as e:
+            self._stale = True
+            log.warning("Failed to bump similar cache version: %s", e)
+
+    async def get_or_compute(
+            self,
+            redis: Optional[Redis],
+            key: str,
+            limit: int,
+            score_cutoff: float,
+            compute: Callable[[], Awaitable[Matches]],
+            resolve: Callable[[Iterable[int]], Awaitable[List[MedicineEntry]]],
+    ) -> Matches:
+        """Результат из кэша или compute() с сохранением в оба уровня.
+
+        resolve - загрузка MedicineEntry по id для результатов из Redis.
+        Без redis работает только процессный LRU.
+        """
+        field = f"{limit}:{score_cutoff:g}:{key}"
+        local = self._local.get(field)
+        if local is not None and (redis is None or local[0] == self._known_version()):
+            return self._local_hit(field, local[1])
+
+        version, cached = await self._read_redis(redis, field)
+        if local is not None and local[0] == version:
+            return self._local_hit(field, local[1])
+
+        if cached is not None and cached["v"] == version:
+            entries = {entry.id: entry for entry in await resolve([medicine_id for medicine_id, _ in cached["r"]])}
+            # Если какое-то лекарство уже удалено - пересчитываем
+            if len(entries) == len(cached["r"]):
+                matches = [(entries[medicine_id], score) for medicine_id, score in cached["r"]]
+                self._put_local(field, version, matches)
+                similar_cache_lookups.labels(result="redis").inc()
+                return matches
+
+        similar_cache_lookups.labels(result="miss").inc()
+        matches = await compute()
+        self._put_local(field, version, matches)
+        if redis is not None:
+            payload = json.dumps({"v": version, "r": [[entry.id, score] for entry, score in matches]})
+            await redis.setex(RESULT_KEY_PREFIX + field, SIMILAR_TTL, payload)
+        return matches
+
+    async def _read_redis(self, redis: Optional[Redis], field: str) -> tuple[Optional[int], Optional[dict]]:
+        """Текущая версия справочника и сохранённый результат (одним запросом)"""
+        if redis is None:
+            return None, None
+
+        await self._bump_version(redis)
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.get(VERSION_KEY)
+            pipe.get(RESULT_KEY_PREFIX + field)
+            version, cached = await pipe.execute()
+        version = int(version or 0)
+        self._set_version(version)
+        return version, json.loads(cached) if cached else None
+
+    def _known_version(self) -> Optional[int]:
+        """Версия, прочитанная не раньше VERSION_TTL секунд назад, иначе None"""
+        if self._stale or self._version is None:
+            return None
+        if asyncio.get_running_loop().time() - self._version_at > VERSION_TTL:
+            return None
+        return self._version
+
+    def _set_version(self, version: int):
+        self._version = version
+        self._version_at = asyncio.get_running_loop().time()
+
+    def _local_hit(self, field: str, matches: Matches) -> Matches:
+        self._local.move_to_end(field)
+        similar_cache_lookups.labels(result="local").inc()
+        return matches
+
+    def _put_local(self, field: str, version: Optional[int], matches: Matches):
+        self._local[field] = (version, matches)
+        self._local.move_to_end(field)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+
+
+similar_cache = SimilarCache()
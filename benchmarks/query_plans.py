@@ -0,0 +1,188 @@
+"""Проверка планов горячих запросов: используются ли индексы по внешним ключам.
+
+Создаёт во временной схеме таблицы аптечек по моделям (со всеми индексами
+из них), заполняет синтетикой объёма живой базы, делает ANALYZE и для каждого
+запроса снимает EXPLAIN (FORMAT JSON). Запросы не переписываются вручную -
+вызываются сами методы репозиториев, а их SQL перехватывается на движке.
+
+Проверяется, что:
+
+- expired_for_user       идёт по ix_medicine_items_kit_expiry;
+- page_by_kit            идёт по ix_medicine_items_kit_expiry;
+- get_summaries          считает участников по ix_user_medicine_kits_medicine_kit_id;
+- удаление лекарства     (каскад ON DELETE) находит экземпляры по ix_medicine_items_medicine_id.
+
+Запуск из корня репозитория (нужен .env, как для бота - из него берётся БД):
+
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --users 50000 --verbose
+
+Код возврата 1, если хотя бы один запрос не использует ожидаемый индекс.
+Схема (--schema, по умолчанию bench_query_plans) удаляется после прогона;
+данные бота не затрагиваются. Как и для миграций, нужен pg_trgm.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine  # noqa: E402
+
+from app.database.models.medicine import (  # noqa: E402
+    Medicine, MedicineItem, MedicineKit, user_medicine_kit_association,
+)
+from app.database.models.users import User  # noqa: E402
+from app.database.psql import DATABASE_URL  # noqa: E402
+from app.repositoryes.MedicineItemRepository import MedicineItemRepository  # noqa: E402
+from app.repositoryes.MedicineKitRepository import MedicineKitRepository  # noqa: E402
+
+TABLES = [User.__table__, MedicineKit.__table__, Medicine.__table__, MedicineItem.__table__, user_medicine_kit_association]
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    expected_index: str
+    used_indexes: List[str]
+    plan: list
+
+    @property
+    def ok(self) -> bool:
+        return self.expected_index in self.used_indexes
+
+
+def plan_indexes(node: dict) -> Iterator[str]:
+    """Все индексы в дереве плана (Index Scan, Index Only Scan, Bitmap Index Scan)"""
+    if "Index Name" in node:
+        yield node["Index Name"]
+    for child in node.get("Plans", []):
+        yield from plan_indexes(child)
+
+
+@contextmanager
+def captured_statements(engine: AsyncEngine) -> Iterator[list]:
+    """SQL и параметры, которые движок отправил в БД внутри блока"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters) -> list:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+async def fill(conn: AsyncConnection, users: int):
+    """Синтетика: у каждого пользователя своя аптечка, у каждой пятой - второй
+    участник, ~10 лекарств в аптечке, около 15% просрочены, у части срок не указан"""
+    kits = users
+    medicines = max(users // 4, 100)
+    await conn.execute(text("INSERT INTO users (id, username) SELECT g, 'user' || g FROM generate_series(1, :n) g"), {"n": users})
+    await conn.execute(text(
+        "INSERT INTO medicine_kits (id, name, deleted) "
+        "SELECT g, 'Аптечка ' || g, g % 50 = 0 FROM generate_series(1, :n) g"
+    ), {"n": kits})
+    await conn.execute(text(
+        "INSERT INTO user_medicine_kits (user_id, medicine_kit_id) "
+        "SELECT g, g FROM generate_series(1, :n) g "
+        "UNION ALL SELECT (g % :n) + 1, g FROM generate_series(5, :n, 5) g"
+    ), {"n": kits})
+    await conn.execute(text(
+        "INSERT INTO medicines (id, name, search_key, medicine_type, category, flags) "
+        "SELECT g, 'Лекарство ' || g, 'лекарство ' || g, 'TABLETS', 'PAINKILLER', g % 2 "
+        "FROM generate_series(1, :n) g"
+    ), {"n": medicines})
+    await conn.execute(text(
+        "INSERT INTO medicine_items (medicine_kit_id, medicine_id, quantity, unit, expiry_date) "
+        "SELECT (g % :kits) + 1, (g * 7919 % :medicines) + 1, 1, 'шт', "
+        "CASE WHEN g % 10 = 0 THEN NULL ELSE current_date + (g * 31 % 700) - 100 END "
+        "FROM generate_series(1, :n) g"
+    ), {"kits": kits, "medicines": medicines, "n": kits * 10})
+    for table in ("users", "medicine_kits", "user_medicine_kits", "medicines", "medicine_items"):
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def check_plans(engine: AsyncEngine) -> List[PlanCheck]:
+    # У пользователя 6 своя аптечка и общая аптечка 5 (в ней два участника)
+    user_id, kit_id, medicine_id = 6, 5, 1
+
+    async with AsyncSession(engine) as session:
+        item_repo = MedicineItemRepository(session)
+        kit_repo = MedicineKitRepository(session)
+        calls = [
+            ("expired_for_user", "ix_medicine_items_kit_expiry", lambda: item_repo.expired_for_user(user_id)),
+            ("page_by_kit", "ix_medicine_items_kit_expiry", lambda: item_repo.page_by_kit(kit_id)),
+            ("get_summaries", "ix_user_medicine_kits_medicine_kit_id", lambda: kit_repo.get_summaries(user_id)),
+            # Каскад ON DELETE из medicines выполняет такой же DELETE по medicine_id
+            ("delete medicine (cascade)", "ix_medicine_items_medicine_id", lambda: session.execute(
+                delete(MedicineItem).where(MedicineItem.medicine_id == medicine_id)
+            )),
+        ]
+        captured = []
+        for name, expected_index, call in calls:
+            with captured_statements(engine) as statements:
+                await call()
+            # Последний запрос метода - сама выборка (перед ней может быть COUNT)
+            captured.append((name, expected_index, *statements[-1]))
+        await session.rollback()
+
+    checks = []
+    async with engine.connect() as conn:
+        for name, expected_index, statement, parameters in captured:
+            plan = await explain(conn, statement, parameters)
+            used = sorted(set(plan_indexes(plan[0]["Plan"])))
+            checks.append(PlanCheck(name, expected_index, used, plan))
+    return checks
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка индексов в планах горячих запросов")
+    parser.add_argument("--users", type=int, default=20000, help="пользователей (и аптечек) в синтетике")
+    parser.add_argument("--schema", default="bench_query_plans", help="временная схема")
+    parser.add_argument("--verbose", action="store_true", help="печатать планы целиком")
+    args = parser.parse_args(argv)
+
+    engine = create_async_engine(
+        DATABASE_URL,
+        # public - там установлен pg_trgm
+        connect_args={"server_settings": {"search_path": f"{args.schema},public"}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+            await conn.execute(text(f'CREATE SCHEMA "{args.schema}"'))
+            for table in TABLES:
+                await conn.run_sync(lambda sync_conn, table=table: table.create(sync_conn))
+            await fill(conn, args.users)
+
+        checks = await check_plans(engine)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+        await engine.dispose()
+
+    for check in checks:
+        status = "ok" if check.ok else "FAIL"
+        print(f"{status:<4} {check.name:<26} ожидается {check.expected_index}; индексы плана: {', '.join(check.used_indexes) or '-'}")
+        if args.verbose or not check.ok:
+            print(json.dumps(check.plan, ensure_ascii=False, indent=2))
+    return 0 if all(check.ok for check in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
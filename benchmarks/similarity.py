@@ -0,0 +1,368 @@
+"""Бенчмарк поиска похожих лекарств на синтетическом справочнике.
+
+Генерирует справочники верифицированных лекарств (по умолчанию 1k/10k/100k
+русских названий) и запросы к ним с опечатками, как их набирают в /upload.
+Для каждого размера сравниваются:
+
+- pg     - find_similar_medicines: pg_trgm-отбор в Postgres + WRatio
+           (холодный кэш, а отдельно - повторные запросы из LRU);
+- index  - процессный MedicineNameIndex (process.extract по всему справочнику),
+           эталон полноты: WRatio без предварительного отбора.
+
+Наборы запросов:
+
+- typo - полное название с 1-2 опечатками (иногда с дозировкой);
+- word - только первое слово составного названия («парацефен» для
+         «Парацефен Форте таблетки шипучие»), в половине случаев с опечаткой.
+         Подходит любое лекарство с этим словом.
+
+Метрики: задержка на запрос (mean/p50/p95/p99), память (размер таблицы и
+GIN-индекса в Postgres, прирост памяти процесса на индекс), recall@k -
+доля запросов, у которых подходящее лекарство попало в top-k, и top-1.
+
+Справочник и запросы детерминированы (--seed), так что цифры сравнимы
+между запусками и коммитами.
+
+Запуск из корня репозитория (нужен .env, как для бота - из него берётся БД):
+
+    python benchmarks/similarity.py
+    python benchmarks/similarity.py --sizes 1000 10000 --queries 200 --json bench.json
+    python benchmarks/similarity.py --no-db   # только MedicineNameIndex
+
+Для pg в той же БД создаётся отдельная схема (--schema, по умолчанию
+bench_similarity), удаляемая после прогона; данные бота не затрагиваются.
+Расширение pg_trgm должно быть установлено (миграции это делают).
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database.models.medicine import MedicineCategory, MedicineType  # noqa: E402
+from app.utils.medicine_index import MedicineEntry, MedicineNameIndex  # noqa: E402
+
+# Части названий: приставка + 0-2 слога + окончание (+ модификатор линейки)
+_PREFIXES = [
+    "амо", "ампи", "аце", "ацикло", "бета", "бром", "вала", "вено", "гало", "гли",
+    "декса", "дикло", "доксо", "ибу", "инда", "кето", "клари", "лева", "лора", "мета",
+    "нафта", "симе", "нуро", "окси", "пара", "пента", "перо", "рани", "сино", "суль",
+    "тера", "тио", "фено", "флуко", "хло", "цефа", "ципро", "энала", "эрго", "азитро",
+]
+_SYLLABLES = ["кси", "це", "про", "фе", "ра", "ни", "то", "ла", "зо", "ме", "ди", "ко", "пи", "ри"]
+_SUFFIXES = [
+    "мол", "фен", "цин", "лин", "прил", "зол", "тан", "рон", "вир", "мицин",
+    "кам", "дин", "пам", "нол", "сан", "тин", "фан", "дол", "кор", "зим",
+]
+_MODIFIERS = [
+    "Форте", "Экстра", "Лонг", "Ретард", "Нео", "Актив", "Кидс", "Плюс", "Макс",
+    "Тева", "Рихтер", "Сандоз", "Мини", "Ультра", "Дуо", "С",
+]
+# Лекарственная форма в названии, как в реестре: «Нурофен для детей суспензия»
+_FORMS = [
+    "таблетки", "таблетки шипучие", "капсулы", "для детей", "суспензия для детей",
+    "спрей назальный", "капли глазные", "мазь для наружного применения",
+    "раствор для инъекций", "порошок для приготовления раствора",
+]
+_DOSAGES = ["100мг", "200 мг", "250мг", "400 мг", "500мг", "5 мл", "2,5%", "10мг"]
+
+# Соседние клавиши ЙЦУКЕН для опечаток замены
+_KEYBOARD_ROWS = ["йцукенгшщзхъ", "фывапролджэ", "ячсмитьбю"]
+_NEIGHBOURS = {
+    ch: "".join(
+        row[j] for j in (i - 1, i + 1) if 0 <= j < len(row)
+    )
+    for row in _KEYBOARD_ROWS
+    for i, ch in enumerate(row)
+}
+
+
+@dataclass
+class LatencyStats:
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @classmethod
+    def from_seconds(cls, samples: List[float]) -> "LatencyStats":
+        ms = sorted(s * 1000 for s in samples)
+        q = statistics.quantiles(ms, n=100, method="inclusive")
+        return cls(mean_ms=statistics.fmean(ms), p50_ms=q[49], p95_ms=q[94], p99_ms=q[98])
+
+
+# Запрос и id подходящих лекарств
+Queries = List[tuple[str, frozenset[int]]]
+
+
+@dataclass
+class BenchResult:
+    size: int
+    method: str
+    queries: str
+    latency: LatencyStats
+    recall_at_k: float
+    top1: float
+    memory: dict = field(default_factory=dict)
+
+
+def generate_catalogue(size: int, rng: random.Random) -> List[MedicineEntry]:
+    """Уникальные названия вида «Ибупрокам», «Парацефен Форте», «Лоразол-Тева»,
+    «Нуроцин Экстра капли глазные»"""
+    names: dict[str, None] = {}
+    while len(names) < size:
+        stem = rng.choice(_PREFIXES) + "".join(rng.choices(_SYLLABLES, k=rng.randint(0, 2))) + rng.choice(_SUFFIXES)
+        name = stem.capitalize()
+        if rng.random() < 0.4:
+            modifier = rng.choice(_MODIFIERS)
+            name = f"{name}-{modifier}" if modifier in ("Тева", "Рихтер", "Сандоз") else f"{name} {modifier}"
+        if rng.random() < 0.3:
+            name = f"{name} {rng.choice(_FORMS)}"
+        names[name] = None
+
+    types, categories = list(MedicineType), list(MedicineCategory)
+    return [
+        MedicineEntry(
+            id=i,
+            name=name,
+            dosage=None,
+            medicine_type=rng.choice(types),
+            category=rng.choice(categories),
+        )
+        for i, name in enumerate(names, start=1)
+    ]
+
+
+def make_typo(name: str, rng: random.Random) -> str:
+    """1-2 опечатки: соседняя клавиша, пропуск, перестановка, удвоение буквы"""
+    chars = list(name.lower())
+    for _ in range(rng.choice((1, 1, 2))):
+        letters = [i for i, ch in enumerate(chars) if ch.isalpha()]
+        if len(letters) < 4:
+            break
+        i = rng.choice(letters[1:])
+        op = rng.random()
+        if op < 0.35 and _NEIGHBOURS.get(chars[i]):
+            chars[i] = rng.choice(_NEIGHBOURS[chars[i]])
+        elif op < 0.6:
+            del chars[i]
+        elif op < 0.85 and i + 1 < len(chars) and chars[i + 1].isalpha():
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            chars.insert(i, chars[i])
+    query = "".join(chars).replace("ё", "е")
+    if rng.random() < 0.3:
+        query = f"{query} {rng.choice(_DOSAGES)}"
+    return query
+
+
+def generate_queries(catalogue: List[MedicineEntry], count: int, rng: random.Random) -> Queries:
+    """Запросы с опечатками: (текст, {id исходного лекарства})"""
+    return [
+        (make_typo(entry.name, rng), frozenset([entry.id]))
+        for entry in rng.sample(catalogue, min(count, len(catalogue)))
+    ]
+
+
+def generate_word_queries(catalogue: List[MedicineEntry], count: int, rng: random.Random) -> Queries:
+    """Первое слово составного названия: (текст, id всех лекарств с этим словом)"""
+    by_word: dict[str, set[int]] = {}
+    for entry in catalogue:
+        by_word.setdefault(entry.name.split()[0].lower(), set()).add(entry.id)
+    compound = [entry for entry in catalogue if " " in entry.name]
+    queries = []
+    for entry in rng.sample(compound, min(count, len(compound))):
+        word = entry.name.split()[0]
+        text = make_typo(word, rng) if rng.random() < 0.5 else word.lower()
+        # make_typo иногда дописывает дозировку - для этого набора она не нужна
+        queries.append((text.split()[0], frozenset(by_word[word.lower()])))
+    return queries
+
+
+async def measure(
+        method: str,
+        size: int,
+        query_set: str,
+        queries: Queries,
+        search: Callable[[str], Awaitable[List[tuple[MedicineEntry, float]]]],
+        memory: dict,
+) -> BenchResult:
+    """Прогнать запросы по одному, собрать задержки и recall"""
+    latencies, hits, top1 = [], 0, 0
+    for query, expected in queries:
+        started = time.perf_counter()
+        found = await search(query)
+        latencies.append(time.perf_counter() - started)
+        ids = [entry.id for entry, _ in found]
+        hits += not expected.isdisjoint(ids)
+        top1 += bool(ids) and ids[0] in expected
+    return BenchResult(
+        size=size,
+        method=method,
+        queries=query_set,
+        latency=LatencyStats.from_seconds(latencies),
+        recall_at_k=hits / len(queries),
+        top1=top1 / len(queries),
+        memory=memory,
+    )
+
+
+async def bench_index(
+        catalogue: List[MedicineEntry],
+        query_sets: dict[str, Queries],
+        k: int,
+        score_cutoff: float,
+) -> List[BenchResult]:
+    """MedicineNameIndex: память на построение индекса и поиск в процессе"""
+    gc.collect()
+    tracemalloc.start()
+    index = MedicineNameIndex()
+    index.rebuild(catalogue)
+    index.search("прогрев", limit=k)  # списки для process.extract строятся при первом поиске
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    async def search(query: str):
+        return index.search(query, limit=k, score_cutoff=score_cutoff)
+
+    memory = {"index_mb": round(current / 2 ** 20, 2), "build_peak_mb": round(peak / 2 ** 20, 2)}
+    return [
+        await measure("index", len(catalogue), name, queries, search, memory)
+        for name, queries in query_sets.items()
+    ]
+
+
+async def bench_pg(
+        catalogue: List[MedicineEntry],
+        query_sets: dict[str, Queries],
+        k: int,
+        schema: str,
+) -> List[BenchResult]:
+    """find_similar_medicines против справочника в отдельной схеме Postgres"""
+    from sqlalchemy import insert, text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.database.models.medicine import Medicine
+    from app.database.psql import DATABASE_URL
+    from app.handlers.medicine.upload_items import find_similar_medicines
+    from app.repositoryes.MedicineRepository import MedicineRepository
+    from app.utils.flags import Flags
+    from app.utils.medicine_names import normalize_medicine_name
+    from app.utils.similar_cache import similar_cache
+
+    engine = create_async_engine(
+        DATABASE_URL,
+        # public - там установлен pg_trgm
+        connect_args={"server_settings": {"search_path": f"{schema},public"}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+            await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+            await conn.run_sync(lambda sync_conn: Medicine.__table__.create(sync_conn))
+            await conn.execute(insert(Medicine), [
+                {
+                    "id": entry.id,
+                    "name": entry.name,
+                    "search_key": normalize_medicine_name(entry.name),
+                    "medicine_type": entry.medicine_type,
+                    "category": entry.category,
+                    "dosage": entry.dosage,
+                    "flags": int(Flags.VERIFIED),
+                }
+                for entry in catalogue
+            ])
+            await conn.execute(text("ANALYZE medicines"))
+
+        async with engine.connect() as conn:
+            result = await conn.execute(text(
+                "SELECT pg_table_size('medicines'), pg_indexes_size('medicines'), "
+                "coalesce(pg_relation_size(to_regclass('ix_medicines_search_key_trgm')), 0)"
+            ))
+            sizes = result.one()
+        memory = {
+            name: round(size / 2 ** 20, 2)
+            for name, size in zip(("table_mb", "indexes_mb", "trgm_index_mb"), sizes)
+        }
+
+        results = []
+        async with AsyncSession(engine) as session:
+            repo = MedicineRepository(session)
+
+            async def cold(query: str):
+                similar_cache.invalidate()
+                return await find_similar_medicines(repo, query, limit=k)
+
+            async def cached(query: str):
+                return await find_similar_medicines(repo, query, limit=k)
+
+            await cold("прогрев")
+            for name, queries in query_sets.items():
+                results.append(await measure("pg", len(catalogue), name, queries, cold, memory))
+                # Второй проход теми же запросами - из процессного LRU
+                for query, _ in queries:
+                    await cached(query)
+                results.append(await measure("pg+lru", len(catalogue), name, queries, cached, {}))
+        return results
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        await engine.dispose()
+
+
+def print_results(results: List[BenchResult], k: int):
+    header = f"{'size':>7} {'method':<7} {'queries':<7} {'mean ms':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'recall@' + str(k):>9} {'top1':>6}  memory"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        memory = ", ".join(f"{key}={value}" for key, value in r.memory.items())
+        print(
+            f"{r.size:>7} {r.method:<7} {r.queries:<7} {r.latency.mean_ms:>8.2f} {r.latency.p50_ms:>7.2f} "
+            f"{r.latency.p95_ms:>7.2f} {r.latency.p99_ms:>7.2f} {r.recall_at_k:>9.3f} {r.top1:>6.3f}  {memory}"
+        )
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска похожих лекарств")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="размеры справочника")
+    parser.add_argument("--queries", type=int, default=300, help="запросов на каждый размер")
+    parser.add_argument("-k", type=int, default=3, help="сколько похожих показывать (top-k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-db", action="store_true", help="без Postgres, только MedicineNameIndex")
+    parser.add_argument("--schema", default="bench_similarity", help="временная схема для справочника")
+    parser.add_argument("--json", type=Path, help="сохранить результаты в файл")
+    args = parser.parse_args(argv)
+
+    from app.handlers.medicine.upload_items import SIMILARITY_THRESHOLD
+
+    results = []
+    for size in args.sizes:
+        rng = random.Random(f"{args.seed}:{size}")
+        catalogue = generate_catalogue(size, rng)
+        query_sets = {
+            "typo": generate_queries(catalogue, args.queries, rng),
+            "word": generate_word_queries(catalogue, args.queries, rng),
+        }
+        examples = ", ".join(f"{name} {queries[0][0]!r}" for name, queries in query_sets.items())
+        print(f"Справочник {size}: по {args.queries} запросов, например {examples}", file=sys.stderr)
+
+        results.extend(await bench_index(catalogue, query_sets, args.k, SIMILARITY_THRESHOLD))
+        if not args.no_db:
+            results.extend(await bench_pg(catalogue, query_sets, args.k, args.schema))
+
+    print_results(results, args.k)
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -15,6 +15,7 @@ from app.middleware.redis import RedisMiddleware
 from app.middleware.user import UserCheckMiddleware
 from app.utils.metrics import metrics_run
 from app.utils.scheduler import setup_scheduler, shutdown_scheduler
+from app.utils.similar_cache import similar_cache
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +49,7 @@ async def main():
         sys.exit(1)
 
     metrics_run()
+    similar_cache.bind(redis)
 
     storage = RedisStorage(redis=redis)
 
@@ -74,7 +76,8 @@ async def main():
 
     await set_main_menu(bot)
 
-    setup_scheduler(bot)
+    # Лимиты отправки напоминаний общие для всех реплик - через redis
+    setup_scheduler(bot, redis)
 
     try:
         logger.info("Starting polling...")
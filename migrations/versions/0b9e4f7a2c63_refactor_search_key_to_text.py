@@ -0,0 +1,37 @@
+"""refactor: search key to text
+
+Revision ID: 0b9e4f7a2c63
+Revises: f6a2d9c84e15
+Create Date: 2026-10-18 14:05:31.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4f7a2c63'
+down_revision: Union[str, Sequence[str], None] = 'f6a2d9c84e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Базы, мигрированные до того, как b47a1d6e93f2 стала создавать Text.
+    # Транслитерация удлиняет ключ (щ -> shch), и в VARCHAR(200) он не влезал
+    op.alter_column('medicines', 'search_key',
+               existing_type=sa.String(length=200),
+               type_=sa.Text(),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('medicines', 'search_key',
+               existing_type=sa.Text(),
+               type_=sa.String(length=200),
+               existing_nullable=False,
+               postgresql_using='left(search_key, 200)')
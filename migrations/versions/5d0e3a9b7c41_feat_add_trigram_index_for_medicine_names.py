@@ -0,0 +1,40 @@
+"""feat: add trigram index for medicine names
+
+Revision ID: 5d0e3a9b7c41
+Revises: 37ec294cd22b
+Create Date: 2026-10-17 15:20:41.208367
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e3a9b7c41'
+down_revision: Union[str, Sequence[str], None] = '37ec294cd22b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY не блокирует запись в medicines, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_medicines_name_trgm', 'medicines', ['name'], unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_medicines_name_trgm', table_name='medicines',
+            postgresql_concurrently=True,
+        )
+    # Расширение не удаляем: им могут пользоваться другие объекты БД
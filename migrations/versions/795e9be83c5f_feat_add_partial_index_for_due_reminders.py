@@ -0,0 +1,39 @@
+"""feat: add partial index for due reminders
+
+Revision ID: 795e9be83c5f
+Revises: bac9e574e720
+Create Date: 2026-10-17 11:02:17.554913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '795e9be83c5f'
+down_revision: Union[str, Sequence[str], None] = 'bac9e574e720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в reminders, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reminders_due', 'reminders', ['next_fire_at'], unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_reminders_due', table_name='reminders',
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,35 @@
+"""feat: add kit expiry index to medicine items
+
+Revision ID: 9a4f6c2e1b87
+Revises: e2c8f51a07d3
+Create Date: 2026-10-17 20:11:54.408163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f6c2e1b87'
+down_revision: Union[str, Sequence[str], None] = 'e2c8f51a07d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_medicine_items_kit_expiry', 'medicine_items', ['medicine_kit_id', 'expiry_date'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_medicine_items_kit_expiry', table_name='medicine_items',
+            postgresql_concurrently=True,
+        )
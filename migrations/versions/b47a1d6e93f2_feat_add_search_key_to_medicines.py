@@ -0,0 +1,87 @@
+"""feat: add search key to medicines
+
+Revision ID: b47a1d6e93f2
+Revises: 5d0e3a9b7c41
+Create Date: 2026-10-17 16:05:12.731904
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47a1d6e93f2'
+down_revision: Union[str, Sequence[str], None] = '5d0e3a9b7c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия app.utils.medicine_names на момент миграции: результат миграции
+# не должен меняться вместе с кодом приложения
+_DOSAGE_RE = re.compile(r"\b\d+(?:[.,]\d+)?\s*(?:мкг|mcg|мг|mg|мл|ml|ме|iu|ед|г|g|%)?(?!\w)")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f",
+    "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+
+def _search_key(name: str) -> str:
+    key = name.lower().replace("ё", "е")
+    key = _DOSAGE_RE.sub(" ", key)
+    key = _NON_WORD_RE.sub(" ", key)
+    key = key.translate(_TRANSLIT)
+    return " ".join(key.split())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('medicines', sa.Column('search_key', sa.Text(), nullable=True))
+
+    # Ключ считается в Python копией normalize_medicine_name (см. _search_key).
+    # При изменении нормализации ключи нужно пересчитать отдельной миграцией.
+    connection = op.get_bind()
+    medicines = sa.table('medicines', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('search_key', sa.Text))
+    rows = connection.execute(sa.select(medicines.c.id, medicines.c.name)).all()
+    if rows:
+        connection.execute(
+            medicines.update().where(medicines.c.id == sa.bindparam('medicine_id')),
+            [{'medicine_id': row.id, 'search_key': _search_key(row.name)} for row in rows],
+        )
+    op.alter_column('medicines', 'search_key', nullable=False)
+    op.create_index(op.f('ix_medicines_search_key'), 'medicines', ['search_key'], unique=False)
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_medicines_name_trgm', table_name='medicines',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_medicines_search_key_trgm', 'medicines', ['search_key'], unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'search_key': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_medicines_search_key_trgm', table_name='medicines',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_medicines_name_trgm', 'medicines', ['name'], unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+    op.drop_index(op.f('ix_medicines_search_key'), table_name='medicines')
+    op.drop_column('medicines', 'search_key')
@@ -0,0 +1,45 @@
+"""feat: add foreign key indexes
+
+Revision ID: c3d7b0e54a19
+Revises: 9a4f6c2e1b87
+Create Date: 2026-10-17 20:48:03.226517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d7b0e54a19'
+down_revision: Union[str, Sequence[str], None] = '9a4f6c2e1b87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # medicine_items(medicine_kit_id, expiry_date) создан в 9a4f6c2e1b87
+    # и покрывает поиск по medicine_kit_id
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_medicine_items_medicine_id'), 'medicine_items', ['medicine_id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_medicine_kits_medicine_kit_id', 'user_medicine_kits', ['medicine_kit_id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_medicine_kits_medicine_kit_id', table_name='user_medicine_kits',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_medicine_items_medicine_id'), table_name='medicine_items',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,73 @@
+"""feat: add full text search vectors
+
+Revision ID: e2c8f51a07d3
+Revises: b47a1d6e93f2
+Create Date: 2026-10-17 18:42:37.115204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c8f51a07d3'
+down_revision: Union[str, Sequence[str], None] = 'b47a1d6e93f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражения зафиксированы здесь, а не берутся из модели: миграция не должна
+# меняться вместе с кодом приложения
+MEDICINES_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(dosage, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(dosage, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(notes, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'C')"
+)
+MEDICINE_ITEMS_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(location, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(notes, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('medicines', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(MEDICINES_VECTOR, persisted=True), nullable=True
+    ))
+    op.add_column('medicine_items', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(MEDICINE_ITEMS_VECTOR, persisted=True), nullable=True
+    ))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_medicines_search_vector', 'medicines', ['search_vector'], unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_medicine_items_search_vector', 'medicine_items', ['search_vector'], unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_medicine_items_search_vector', table_name='medicine_items',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_medicines_search_vector', table_name='medicines',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('medicine_items', 'search_vector')
+    op.drop_column('medicines', 'search_vector')